@@ -0,0 +1,217 @@
+"""
+Local stand-in for the Billit API, used by the benchmarks.
+
+Serves paginated list, show, create, update and delete endpoints for every
+resource, with configurable latency, payload size and injected 429/5xx
+responses. Run it standalone with ``python -m benchmarks.mock_server``.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+RESOURCES = (
+    "contacts",
+    "customers",
+    "invoices",
+    "ocps",
+    "payments",
+    "products",
+    "purchases",
+    "tags",
+)
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    records: int = 1000
+    per_page: int = 25
+    payload_size: int = 256
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: float = 0.05
+    seed: int = 0
+
+
+def _record(resource: str, id_: int, payload_size: int) -> dict:
+    return {
+        "id": id_,
+        "uuid": f"00000000-0000-4000-8000-{id_:012d}",
+        "name": f"{resource}-{id_}",
+        "vatId": f"EL{100000000 + id_}",
+        "customerId": id_ % 97,
+        "amount": id_ * 100,
+        "updatedAt": f"2024-01-01T00:00:{id_ % 60:02d}Z",
+        "notes": "x" * payload_size,
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "MockServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers=None):
+        content = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self):
+        config = self.server.config
+        self.server.count_request()
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay:
+            time.sleep(delay)
+
+        roll = self.server.random()
+        if roll < config.rate_429:
+            return self._send(
+                429,
+                {"message": "Too Many Attempts."},
+                {"Retry-After": str(config.retry_after)},
+            )
+        if roll < config.rate_429 + config.rate_5xx:
+            return self._send(503, {"message": "Service Unavailable"})
+
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part][1:]
+        if not parts or parts[0] not in RESOURCES:
+            if parts == ["account"]:
+                return self._send(200, {"id": 1, "company": "Mock"})
+            return self._send(404, {"message": "Not Found"})
+
+        resource = parts[0]
+        if len(parts) == 1 and self.command == "GET":
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            per_page = int(query.get("per_page", [str(config.per_page)])[0])
+            last_page = max(1, -(-config.records // per_page))
+            start = (page - 1) * per_page
+            data = [
+                _record(resource, id_, config.payload_size)
+                for id_ in range(start, min(start + per_page, config.records))
+            ]
+            return self._send(
+                200,
+                {
+                    "current_page": page,
+                    "last_page": last_page,
+                    "per_page": per_page,
+                    "total": config.records,
+                    "data": data,
+                    "next_page_url": (
+                        f"{url.path}?page={page + 1}" if page < last_page else None
+                    ),
+                },
+            )
+        if len(parts) == 1 and self.command == "POST":
+            return self._send(201, _record(resource, 0, config.payload_size))
+        if len(parts) == 2 and self.command == "DELETE":
+            return self._send(204)
+        if len(parts) == 2:
+            id_ = int(parts[1]) if parts[1].isdigit() else 0
+            return self._send(200, _record(resource, id_, config.payload_size))
+
+        return self._send(405, {"message": "Method Not Allowed"})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    Threaded mock Billit server listening on localhost
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[MockConfig] = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), MockHandler)
+        if config is None:
+            config = MockConfig()
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._random_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def random(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on slow responses, e.g. on a timeout, are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def count_request(self):
+        with self._random_lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--payload-size", type=int, default=256)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        records=args.records,
+        payload_size=args.payload_size,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+    )
+    server = MockServer(config, args.port)
+    print(f"Serving mock Billit API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Offline benchmarks of the SDK against the local mock Billit server.
+
+Measures throughput, latency percentiles, CPU time per call and peak memory
+for single calls, bulk invoice creation and paginated listing, and prints
+the results as JSON so that they can be compared across releases:
+
+    python -m benchmarks.run --output results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from billit.client import Client
+from billit.ratelimit import RateLimiter
+from billit.retry import RetryPolicy
+from billit.utils.tax_utils import Tax
+
+from .mock_server import MockConfig, MockServer
+
+INVOICE = dict(
+    customer_id=1,
+    send_mail=False,
+    exclude_mydata=True,
+    invoice_date="2024-01-01",
+    invoice_type_id=1,
+    is_paid=False,
+    mydata_invoice_type="1.1",
+    taxes=[Tax(1, 24)],
+    products=[{"productId": 1, "quantity": 2, "unitPrice": 1000, "taxId": 1}],
+    tags=[],
+    mydata_payment={},
+    mail_options="",
+    reminder=False,
+    payment_method=[],
+)
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(name: str, calls: int, run: Callable[[List[float]], None]) -> Dict:
+    """
+    Run a scenario and report its metrics. ``run`` appends the latency of every
+    call it times to the list it receives. The scenario runs a second time
+    under tracemalloc to measure peak memory, so that tracing overhead does
+    not skew the timings.
+    """
+    latencies: List[float] = []
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    run(latencies)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    tracemalloc.start()
+    run([])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "scenario": name,
+        "calls": calls,
+        "seconds": wall,
+        "requests_per_second": calls / wall if wall else None,
+        "cpu_ms_per_call": cpu * 1000 / calls,
+        "peak_memory_kb": peak / 1024,
+    }
+    if latencies:
+        result.update(
+            p50_ms=_percentile(latencies, 0.5) * 1000,
+            p99_ms=_percentile(latencies, 0.99) * 1000,
+            mean_ms=statistics.fmean(latencies) * 1000,
+        )
+    return result
+
+
+def single_calls(client: Client, calls: int):
+    def run(latencies):
+        for i in range(calls):
+            started = time.perf_counter()
+            client.products.show(str(i))
+            latencies.append(time.perf_counter() - started)
+
+    return measure("single_show", calls, run)
+
+
+def bulk_create(client: Client, calls: int, concurrency: int):
+    def run(latencies):
+        failed = sum(
+            not result.ok
+            for result in client.invoices.create_many(
+                (INVOICE for _ in range(calls)), concurrency=concurrency
+            )
+        )
+        if failed:
+            print(f"bulk_create: {failed} failed", file=sys.stderr)
+
+    return measure(f"bulk_create_c{concurrency}", calls, run)
+
+
+def paginated_list(client: Client, records: int, per_page: int):
+    def run(latencies):
+        count = sum(1 for _ in client.contacts.iter_all(per_page=per_page))
+        assert count == records, count
+
+    return measure(f"iter_all_{per_page}_per_page", records, run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--payload-size", type=int, default=256)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        latency=args.latency,
+        records=args.records,
+        payload_size=args.payload_size,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+    )
+    with MockServer(config) as server:
+        client = Client(
+            "benchmark",
+            rate_limiter=RateLimiter(rate=1e6) if args.rate_429 else None,
+            retry_policy=(
+                RetryPolicy(max_attempts=5, backoff_factor=0.01)
+                if args.rate_429 or args.rate_5xx
+                else None
+            ),
+            pool_maxsize=max(10, args.concurrency),
+        )
+        client.base_url = server.base_url
+        with client:
+            results = [
+                single_calls(client, args.calls),
+                bulk_create(client, args.calls, 1),
+                bulk_create(client, args.calls, args.concurrency),
+                paginated_list(client, args.records, args.per_page),
+            ]
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
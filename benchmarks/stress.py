@@ -0,0 +1,116 @@
+"""
+Stress check of a single Client shared by many threads.
+
+Threads read products and contacts through per-request views made with
+``with_options``, and create invoices, all through one client with a response
+cache, validator store, rate limiter, retry policy and instrumentation. The
+check fails unless every response matches its request and the client's
+metrics account for every request the mock server received:
+
+    python -m benchmarks.stress --threads 32 --operations 200
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+
+from billit.cache import MemoryCache, ResponseCache, ValidatorStore
+from billit.client import Client
+from billit.instrumentation import Instrumentation
+from billit.ratelimit import RateLimiter
+from billit.retry import RetryPolicy
+
+from .mock_server import MockConfig, MockServer
+from .run import INVOICE
+
+
+def worker(client: Client, seed: int, operations: int, records: int, errors: list):
+    rng = random.Random(seed)
+    for _ in range(operations):
+        id_ = rng.randrange(records)
+        view = client.with_options(timeout=rng.choice((5.0, 10.0)))
+        try:
+            operation = rng.random()
+            if operation < 0.45:
+                product = view.products.show(id_)
+                if product["id"] != id_:
+                    errors.append(f"products/{id_} returned {product['id']}")
+            elif operation < 0.9:
+                contact = view.contacts.show(id_)
+                if contact["id"] != id_:
+                    errors.append(f"contacts/{id_} returned {contact['id']}")
+            else:
+                view.invoices.create(**INVOICE)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--rate-429", type=float, default=0.01)
+    parser.add_argument("--rate-5xx", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        latency=0.001,
+        jitter=0.002,
+        records=args.records,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=0.01,
+    )
+    instrumentation = Instrumentation()
+    errors: list = []
+    with MockServer(config) as server:
+        client = Client(
+            "benchmark",
+            pool_maxsize=args.threads,
+            rate_limiter=RateLimiter(rate=1e6, max_retries=10),
+            retry_policy=RetryPolicy(max_attempts=10, backoff_factor=0.01),
+            cache=ResponseCache(MemoryCache(maxsize=args.records // 2)),
+            validators=ValidatorStore(),
+            instrumentation=instrumentation,
+        )
+        client.base_url = server.base_url
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(client, seed, args.operations, args.records, errors),
+            )
+            for seed in range(args.threads)
+        ]
+        started = time.perf_counter()
+        with client:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        seconds = time.perf_counter() - started
+
+    sent = sum(stats["requests"] for stats in instrumentation.snapshot().values())
+    if sent != server.requests:
+        errors.append(f"client sent {sent} requests, server received {server.requests}")
+
+    print(
+        json.dumps(
+            {
+                "threads": args.threads,
+                "operations": args.threads * args.operations,
+                "requests": server.requests,
+                "seconds": seconds,
+                "errors": errors[:20],
+            },
+            indent=2,
+        )
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+import asyncio
+from functools import cached_property
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from . import upsert
+from .bulk import DEFAULT_CONCURRENCY, BulkResult, run_bulk_async
+from .cache import MISS, ResponseCache, ValidatorStore, cache_key
+from .circuit import CircuitBreaker
+from .client import (
+    OCP,
+    Account,
+    BaseClient,
+    Contacts,
+    Customers,
+    Invoices,
+    ListableSubClient,
+    Payments,
+    Products,
+    Purchases,
+    Tags,
+    UpdatableSubClient,
+    UpsertableSubClient,
+    unwrap_record,
+)
+from .codec import JSONCodec
+from .constants import PRODUCTION_ENVIRONMENT
+from .instrumentation import Instrumentation
+from .pagination import Page, paginate_async
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import AsyncSingleFlight
+from .transport import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TIMEOUT,
+    Timeout,
+)
+
+try:
+    import httpx  # type: ignore
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+RETRYABLE_ERRORS = (httpx.TransportError,) if httpx is not None else ()
+
+
+class AsyncTransport:
+    """
+    Pooled, non-blocking HTTP transport used by the async client.
+
+    Any object exposing ``async request(method, url, **kwargs)`` and
+    ``async close()`` can be passed to the async client in its place.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        client=None,
+    ):
+        if client is None:
+            if httpx is None:
+                raise ImportError(
+                    "AsyncClient requires httpx, install it with `pip install billit[async]`"
+                )
+
+            # Every connection goes to the same host, so all of them are kept
+            # alive: closing the extra ones would mean a new TLS handshake per
+            # request whenever more than a few are in flight
+            max_connections = pool_connections * pool_maxsize
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                follow_redirects=True,
+            )
+        self.client = client
+
+    async def request(self, method, url, params=None, timeout=None, **kwargs):
+        if params is not None:
+            params = {key: value for key, value in params.items() if value is not None}
+        if timeout is None:
+            # No timeout, as with requests, rather than httpx's default
+            timeout = httpx.Timeout(None)
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+
+        return await self.client.request(
+            method, url, params=params, timeout=timeout, **kwargs
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncClient(BaseClient):
+    """
+    Asynchronous Billit API client.
+
+    Exposes the same sub-clients as ``Client``; every API method returns an
+    awaitable instead of the decoded response.
+    """
+
+    _retryable_errors = RETRYABLE_ERRORS
+
+    def __init__(
+        self,
+        api_key,
+        environment=PRODUCTION_ENVIRONMENT,
+        transport=None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorStore] = None,
+        response_models: bool = False,
+        codec: Optional[JSONCodec] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce: bool = False,
+        validate: bool = False,
+    ):
+        super().__init__(
+            api_key,
+            environment,
+            rate_limiter,
+            retry_policy,
+            cache,
+            validators,
+            response_models,
+            codec,
+            instrumentation,
+            timeout,
+            circuit_breaker,
+            validate,
+        )
+        self._owns_transport = transport is None
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.transport = (
+            transport
+            if transport is not None
+            else AsyncTransport(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize
+            )
+        )
+
+    @cached_property
+    def account(self) -> "AsyncAccount":
+        return AsyncAccount(self)
+
+    @cached_property
+    def invoices(self) -> "AsyncInvoices":
+        return AsyncInvoices(self)
+
+    @cached_property
+    def customers(self) -> "AsyncCustomers":
+        return AsyncCustomers(self)
+
+    @cached_property
+    def contacts(self) -> "AsyncContacts":
+        return AsyncContacts(self)
+
+    @cached_property
+    def ocp(self) -> "AsyncOCP":
+        return AsyncOCP(self)
+
+    @cached_property
+    def products(self) -> "AsyncProducts":
+        return AsyncProducts(self)
+
+    @cached_property
+    def tags(self) -> "AsyncTags":
+        return AsyncTags(self)
+
+    @cached_property
+    def purchases(self) -> "AsyncPurchases":
+        return AsyncPurchases(self)
+
+    @cached_property
+    def payments(self) -> "AsyncPayments":
+        return AsyncPayments(self)
+
+    async def close(self):
+        """
+        Release pooled connections, unless the transport was passed in by the caller
+        """
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle_request(
+        self, method, endpoint, params=None, data=None, headers=None
+    ):
+        result = await self._cached_request(method, endpoint, params, data, headers)
+        if self.response_models:
+            return self._decode_models(endpoint, result)
+        return result
+
+    async def _cached_request(
+        self, method, endpoint, params=None, data=None, headers=None
+    ):
+        if self.cache is None:
+            if method == "GET":
+                return await self._coalesced_request(method, endpoint, params, headers)
+            return await self._send_request(method, endpoint, params, data, headers)
+
+        if method != "GET":
+            try:
+                return await self._send_request(method, endpoint, params, data, headers)
+            finally:
+                self.cache.invalidate(self.cache_scope, endpoint)
+
+        result = self.cache.get(self.cache_scope, endpoint, params)
+        if result is MISS:
+            result = await self._coalesced_request(method, endpoint, params, headers)
+        return result
+
+    async def _coalesced_request(self, method, endpoint, params=None, headers=None):
+        async def fetch():
+            result = await self._send_request(method, endpoint, params, None, headers)
+            if self.cache is not None:
+                self.cache.set(self.cache_scope, endpoint, params, result)
+            return result
+
+        if self.single_flight is None or headers:
+            return await fetch()
+
+        key = cache_key(self.cache_scope, endpoint, params)
+        return await self.single_flight.do(key, fetch)
+
+    async def _send_request(
+        self, method, endpoint, params=None, data=None, headers=None
+    ):
+        call = self._prepare_call(method, endpoint, params, data, headers)
+        while True:
+            wait = self._admit_attempt(call)
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                timeout = self._start_attempt(call)
+                response = await self.transport.request(
+                    method,
+                    self.base_url + endpoint,
+                    params=params,
+                    content=call.body,
+                    headers=call.headers,
+                    auth=self.auth,
+                    timeout=timeout,
+                )
+            except BaseException as e:
+                # Including cancellation of the task awaiting the request
+                delay = self._attempt_failed(call, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._attempt_succeeded(call, response)
+                if delay is None:
+                    return self._handle_conditional_response(
+                        method, endpoint, params, response, call.entry
+                    )
+
+            await asyncio.sleep(delay)
+
+
+class AsyncListableSubClient(ListableSubClient):
+    def iter_pages(  # type: ignore[override]
+        self, start_page: int = 1, prefetch: bool = True, **filters
+    ) -> AsyncIterator[Page]:
+        """
+        Async counterpart of ``ListableSubClient.iter_pages``, to be used with
+        ``async for``
+        """
+        fetch = self._fetch_page(self._list_params(**filters))
+        return paginate_async(fetch, start_page, prefetch)
+
+    async def iter_all(  # type: ignore[override]
+        self, start_page: int = 1, prefetch: bool = True, **filters
+    ):
+        """
+        Async counterpart of ``ListableSubClient.iter_all``
+        """
+        async for page in self.iter_pages(start_page, prefetch, **filters):
+            for record in page.records:
+                yield record
+
+
+class AsyncUpdatableSubClient(AsyncListableSubClient, UpdatableSubClient):
+    async def update_fields(  # type: ignore[override]
+        self, resource_id, current=None, **changes
+    ):
+        """
+        Async counterpart of ``UpdatableSubClient.update_fields``
+        """
+        endpoint, known, data, headers = self._field_changes(
+            resource_id, current, changes
+        )
+        if not data:
+            if self.client.response_models:
+                return self.client._decode_models(endpoint, known)
+            return known
+
+        return unwrap_record(
+            await self.client._handle_request(
+                "PATCH", endpoint, data=data, headers=headers
+            )
+        )
+
+
+class AsyncUpsertableSubClient(AsyncUpdatableSubClient, UpsertableSubClient):
+    async def upsert_many(  # type: ignore[override]
+        self,
+        rows: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        existing: Optional[Iterable[Any]] = None,
+        **filters,
+    ) -> upsert.UpsertReport:
+        """
+        Async counterpart of ``UpsertableSubClient.upsert_many``
+        """
+        if existing is None:
+            existing = [record async for record in self.iter_all(**filters)]
+        planned = self._upsert_plan(rows, existing)
+        writes = [p for p in planned if p.action in (upsert.CREATE, upsert.UPDATE)]
+        async for outcome in run_bulk_async(self._upsert_write, writes, concurrency):
+            outcome.item.result, outcome.item.error = outcome.result, outcome.error
+        return upsert.UpsertReport(planned)
+
+
+class AsyncAccount(Account):
+    pass
+
+
+class AsyncInvoices(AsyncUpdatableSubClient, Invoices):
+    def create_many(  # type: ignore[override]
+        self,
+        invoices: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[BulkResult]:
+        """
+        Async counterpart of ``Invoices.create_many``, to be used with ``async for``
+        """
+        return run_bulk_async(
+            lambda invoice: self.create(**invoice), invoices, concurrency, ordered
+        )
+
+
+class AsyncCustomers(AsyncUpsertableSubClient, Customers):
+    pass
+
+
+class AsyncContacts(AsyncUpsertableSubClient, Contacts):
+    pass
+
+
+class AsyncOCP(AsyncUpdatableSubClient, OCP):
+    pass
+
+
+class AsyncProducts(AsyncUpdatableSubClient, Products):
+    pass
+
+
+class AsyncTags(AsyncListableSubClient, Tags):
+    pass
+
+
+class AsyncPurchases(AsyncListableSubClient, Purchases):
+    pass
+
+
+class AsyncPayments(AsyncListableSubClient, Payments):
+    def create_many(  # type: ignore[override]
+        self,
+        payments: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[BulkResult]:
+        """
+        Async counterpart of ``Payments.create_many``, to be used with ``async for``
+        """
+        return run_bulk_async(
+            lambda payment: self.create(**payment), payments, concurrency, ordered
+        )
@@ -8,7 +8,8 @@ class BillitAuthentication(AuthBase):
 
     def __init__(self, api_key):
         self.api_key = api_key
+        self.header = f"Bearer {api_key}"
 
     def __call__(self, r):
-        r.headers["Authorization"] = f"Bearer {self.api_key}"
+        r.headers["Authorization"] = self.header
         return r
@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class BulkResult:
+    """
+    Outcome of a single item of a bulk operation
+    """
+
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _call(func, index, item):
+    try:
+        return BulkResult(index, item, result=func(item))
+    except Exception as e:
+        return BulkResult(index, item, error=e)
+
+
+def _submit(executor, func, index, item):
+    # Run in a copy of the caller's context, so that a deadline set around the
+    # bulk operation applies to every item
+    return executor.submit(copy_context().run, _call, func, index, item)
+
+
+def run_bulk(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+) -> Iterator[BulkResult]:
+    """
+    Apply ``func`` to every item with at most ``concurrency`` calls in flight.
+
+    Items are pulled from ``items`` lazily, so arbitrarily large iterables can
+    be processed with bounded memory. Exceptions raised by ``func`` are
+    captured on the item's result and never abort the run. Results are yielded
+    in input order when ``ordered`` is true, otherwise as they complete.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    source = enumerate(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if ordered:
+            queue: deque = deque(
+                _submit(executor, func, index, item)
+                for index, item in itertools.islice(source, concurrency)
+            )
+            while queue:
+                result = queue.popleft().result()
+                for index, item in itertools.islice(source, 1):
+                    queue.append(_submit(executor, func, index, item))
+                yield result
+        else:
+            pending = {
+                _submit(executor, func, index, item)
+                for index, item in itertools.islice(source, concurrency)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for index, item in itertools.islice(source, len(done)):
+                    pending.add(_submit(executor, func, index, item))
+                for future in done:
+                    yield future.result()
+
+
+async def _acall(func, index, item):
+    try:
+        return BulkResult(index, item, result=await func(item))
+    except Exception as e:
+        return BulkResult(index, item, error=e)
+
+
+async def run_bulk_async(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+) -> AsyncIterator[BulkResult]:
+    """
+    Async counterpart of ``run_bulk`` where ``func`` returns an awaitable
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    source = enumerate(items)
+    tasks: deque = deque(
+        asyncio.ensure_future(_acall(func, index, item))
+        for index, item in itertools.islice(source, concurrency)
+    )
+    try:
+        while tasks:
+            if ordered:
+                task = tasks.popleft()
+            else:
+                finished, _ = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                task = finished.pop()
+                tasks.remove(task)
+            result = await task
+            for index, item in itertools.islice(source, 1):
+                tasks.append(asyncio.ensure_future(_acall(func, index, item)))
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
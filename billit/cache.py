@@ -0,0 +1,249 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+MISS = object()
+
+DEFAULT_TTLS = {
+    "account": 300.0,
+    "contacts": 300.0,
+    "products": 300.0,
+    "tags": 300.0,
+}
+
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISS
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    LRU cache persisted in a local SQLite database, so that several worker
+    processes on the same host can share cached responses. Entries are scoped
+    per account, so clients of different accounts can share one too.
+
+    Values must be JSON serializable.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10000):
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISS
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return MISS
+
+            self._connection.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+
+        return json.loads(value)
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            (size,) = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if size > self.maxsize:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (size - self.maxsize,),
+                )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def invalidate(self, prefix: str):
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def resource_of(endpoint: str) -> str:
+    """
+    Return the resource an endpoint belongs to, e.g. ``products`` for ``/products/5``
+    """
+    return endpoint.lstrip("/").split("/", 1)[0]
+
+
+def cache_scope(base_url: str, api_key: str) -> str:
+    """
+    Return the scope of the entries of an account on an environment, so that
+    clients of different accounts sharing a backend never see each other's
+    entries. Only a digest of the API key is kept in it.
+    """
+    digest = hashlib.sha256(str(api_key).encode()).hexdigest()[:16]
+    return f"{base_url}#{digest}"
+
+
+def resource_prefix(scope: str, endpoint: str) -> str:
+    return f"{scope}/{resource_of(endpoint)}|"
+
+
+def cache_key(scope: str, endpoint: str, params: Optional[dict] = None) -> str:
+    """
+    Build a key that starts with the resource prefix of the endpoint, so that
+    all entries of a resource can be invalidated at once
+    """
+    query = ""
+    if params:
+        query = urlencode(
+            sorted((k, v) for k, v in params.items() if v is not None), doseq=True
+        )
+    return f"{resource_prefix(scope, endpoint)}{endpoint}?{query}"
+
+
+class ResponseCache:
+    """
+    Read-through cache for GET responses of the resources listed in ``ttls``.
+
+    Entries are keyed by scope (see ``cache_scope``), endpoint and query
+    parameters. Any other request on a resource made through the same client
+    invalidates every cached entry of that resource within its scope.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+
+    def get(self, scope: str, endpoint: str, params: Optional[dict] = None) -> Any:
+        if resource_of(endpoint) not in self.ttls:
+            return MISS
+
+        return self.backend.get(cache_key(scope, endpoint, params))
+
+    def set(self, scope: str, endpoint: str, params: Optional[dict], value):
+        ttl = self.ttls.get(resource_of(endpoint))
+        if ttl is not None:
+            self.backend.set(cache_key(scope, endpoint, params), value, ttl)
+
+    def invalidate(self, scope: str, endpoint: str):
+        if resource_of(endpoint) in self.ttls:
+            self.backend.invalidate(resource_prefix(scope, endpoint))
+
+
+class ValidatorStore:
+    """
+    Store of the ``ETag``/``Last-Modified`` validators of GET responses along
+    with their bodies, used to revalidate them with conditional requests.
+
+    Requests on a resource other than GET drop the stored validators of that
+    resource.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryCache(maxsize=10000)
+
+    def get(
+        self, scope: str, endpoint: str, params: Optional[dict] = None
+    ) -> Optional[dict]:
+        entry = self.backend.get(cache_key(scope, endpoint, params))
+        return None if entry is MISS else entry
+
+    def set(self, scope: str, endpoint: str, params: Optional[dict], headers, body):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        key = cache_key(scope, endpoint, params)
+        if etag is None and last_modified is None:
+            self.backend.delete(key)
+            return
+
+        self.backend.set(
+            key, {"etag": etag, "last_modified": last_modified, "body": body}
+        )
+
+    def invalidate(self, scope: str, endpoint: str):
+        self.backend.invalidate(resource_prefix(scope, endpoint))
@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy  # type: ignore
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+from .models import as_dict
+
+PER_LINE = "line"
+PER_INVOICE = "invoice"
+
+# Largest product of scaled quantity and price handled with 64-bit integers
+_INT64_LIMIT = 2**62
+
+
+def _scaled(value: Any, decimals: int) -> int:
+    """
+    Return ``value`` as an integer number of ``10 ** -decimals`` units, or raise
+    ``ValueError`` when it is not a number or has more decimals
+    """
+    if isinstance(value, bool):
+        raise ValueError("not a number")
+    scale = 10**decimals
+    if isinstance(value, int):
+        return value * scale
+    if isinstance(value, float):
+        scaled = round(value * scale)
+        if scaled / scale == value:
+            return scaled
+    try:
+        number = Decimal(str(value)).scaleb(decimals)
+    except InvalidOperation:
+        raise ValueError("not a number")
+    if not number.is_finite():
+        raise ValueError("not a number")
+    if number != number.to_integral_value():
+        raise ValueError(f"more than {decimals} decimals")
+    return int(number)
+
+
+def _half_up(value: int, divisor: int) -> int:
+    # Integer division rounding halves away from zero, like ROUND_HALF_UP
+    quotient = (abs(value) * 2 + divisor) // (divisor * 2)
+    return -quotient if value < 0 else quotient
+
+
+def _half_up_array(values, divisor: int):
+    return numpy.sign(values) * ((numpy.abs(values) * 2 + divisor) // (divisor * 2))
+
+
+@dataclass
+class Totals:
+    """
+    Net, VAT and gross totals of a batch of invoices, in input order, as
+    integers of minor currency units (e.g. cents). Invoices with errors have
+    zero totals and their error messages in ``errors``, keyed by index.
+    """
+
+    net: List[int]
+    vat: List[int]
+    gross: List[int]
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+    exponent: int = 2
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def amounts(self, index: int) -> Dict[str, Decimal]:
+        """
+        Return the totals of an invoice as decimal amounts, e.g. ``12.40``
+        """
+        return {
+            "net": Decimal(self.net[index]).scaleb(-self.exponent),
+            "vat": Decimal(self.vat[index]).scaleb(-self.exponent),
+            "gross": Decimal(self.gross[index]).scaleb(-self.exponent),
+        }
+
+
+def compute_totals(
+    invoices: Iterable[Any],
+    vat_rates: Dict[Any, Any],
+    rounding: str = PER_LINE,
+    vat_key: str = "vatId",
+    quantity_decimals: int = 3,
+    price_decimals: int = 4,
+    rate_decimals: int = 2,
+    exponent: int = 2,
+    use_numpy: Optional[bool] = None,
+) -> Totals:
+    """
+    Compute the totals of invoices locally, without any API call.
+
+    Each invoice is a record or a dict of ``Invoices.create`` arguments, whose
+    ``products`` lines have a ``quantity``, a ``unitPrice`` and a VAT category
+    under ``vat_key``, mapped to a percentage by ``vat_rates``, e.g.
+    ``{1: 24, 2: 13, 3: 6}``. Line net amounts are rounded to minor units;
+    VAT is rounded per line, or per invoice and rate with ``PER_INVOICE``.
+    Rounding is half up, and all arithmetic is exact: amounts are parsed once
+    into scaled integers, then computed in columns with NumPy when installed
+    (``pip install billit[numpy]``), or in pure Python otherwise.
+    """
+    if rounding not in (PER_LINE, PER_INVOICE):
+        raise ValueError(f"Unknown rounding: {rounding}")
+    if quantity_decimals + price_decimals < exponent:
+        raise ValueError("Quantities and prices are less precise than amounts")
+
+    codes: Dict[Any, int] = {}
+    rates: List[int] = []
+    for key, rate in vat_rates.items():
+        codes[key] = len(rates)
+        rates.append(_scaled(rate, rate_decimals))
+
+    # Flatten the product lines into columns
+    invoice_column: List[int] = []
+    quantities: List[int] = []
+    prices: List[int] = []
+    rate_codes: List[int] = []
+    errors: Dict[int, List[str]] = {}
+    count = 0
+    for index, invoice in enumerate(invoices):
+        count += 1
+        lines = []
+        messages = []
+        for number, line in enumerate(as_dict(invoice).get("products") or []):
+            line = as_dict(line)
+            try:
+                quantity = _scaled(line.get("quantity"), quantity_decimals)
+            except ValueError as e:
+                messages.append(f"products[{number}].quantity: {e}")
+                continue
+            try:
+                price = _scaled(line.get("unitPrice"), price_decimals)
+            except ValueError as e:
+                messages.append(f"products[{number}].unitPrice: {e}")
+                continue
+            code = codes.get(line.get(vat_key))
+            if code is None:
+                messages.append(f"products[{number}].{vat_key}: unknown VAT rate")
+                continue
+            lines.append((quantity, price, code))
+
+        if messages:
+            errors[index] = messages
+            continue
+        for quantity, price, code in lines:
+            invoice_column.append(index)
+            quantities.append(quantity)
+            prices.append(price)
+            rate_codes.append(code)
+
+    net_divisor = 10 ** (quantity_decimals + price_decimals - exponent)
+    vat_divisor = 10 ** (rate_decimals + 2)
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError("Computing totals with NumPy requires numpy")
+    if use_numpy and quantities:
+        # Fall back to unbounded Python integers when int64 could overflow
+        largest = max(map(abs, quantities)) * max(map(abs, prices))
+        largest_vat = (largest // net_divisor + 1) * len(quantities) * max(rates)
+        use_numpy = max(largest, largest_vat) < _INT64_LIMIT
+
+    compute = _compute_numpy if use_numpy else _compute_python
+    net, vat = compute(
+        count,
+        invoice_column,
+        quantities,
+        prices,
+        rate_codes,
+        rates,
+        rounding,
+        net_divisor,
+        vat_divisor,
+    )
+    gross = [n + v for n, v in zip(net, vat)]
+    return Totals(net, vat, gross, errors, exponent)
+
+
+def _compute_python(
+    count, invoice_column, quantities, prices, rate_codes, rates, rounding, nd, vd
+):
+    net = [0] * count
+    vat = [0] * count
+    groups: Dict[tuple, int] = {}
+    for index, quantity, price, code in zip(
+        invoice_column, quantities, prices, rate_codes
+    ):
+        line_net = _half_up(quantity * price, nd)
+        net[index] += line_net
+        if rounding == PER_LINE:
+            vat[index] += _half_up(line_net * rates[code], vd)
+        else:
+            groups[index, code] = groups.get((index, code), 0) + line_net
+
+    for (index, code), group_net in groups.items():
+        vat[index] += _half_up(group_net * rates[code], vd)
+    return net, vat
+
+
+def _compute_numpy(
+    count, invoice_column, quantities, prices, rate_codes, rates, rounding, nd, vd
+):
+    int64 = numpy.int64
+    index = numpy.array(invoice_column, dtype=int64)
+    code = numpy.array(rate_codes, dtype=int64)
+    rate = numpy.array(rates or [0], dtype=int64)
+
+    line_net = _half_up_array(
+        numpy.array(quantities, dtype=int64) * numpy.array(prices, dtype=int64), nd
+    )
+    net = numpy.zeros(count, dtype=int64)
+    numpy.add.at(net, index, line_net)
+
+    vat = numpy.zeros(count, dtype=int64)
+    if rounding == PER_LINE:
+        numpy.add.at(vat, index, _half_up_array(line_net * rate[code], vd))
+    else:
+        groups = numpy.zeros((count, len(rate)), dtype=int64)
+        numpy.add.at(groups, (index, code), line_net)
+        vat = _half_up_array(groups * rate, vd).sum(axis=1)
+    return net.tolist(), vat.tolist()
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from .cache import resource_of
+from .exceptions import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SERVER_ERROR_STATUS = 500
+
+
+def circuit_key(base_url: str, endpoint: str) -> str:
+    """
+    Return the circuit of an endpoint: its environment and resource, e.g.
+    ``https://api.billit.io/v1/invoices`` for ``/invoices/5``
+    """
+    return f"{base_url}/{resource_of(endpoint)}"
+
+
+class _Circuit:
+    __slots__ = ("state", "outcomes", "opened_at", "probes", "successes", "rejected")
+
+    def __init__(self, window_size: int):
+        self.state = CLOSED
+        # (failed, slow) of the latest calls while closed
+        self.outcomes: deque = deque(maxlen=window_size)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.successes = 0
+        self.rejected = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker failing requests fast while the Billit API is unhealthy.
+
+    A circuit is kept per environment and resource. It opens when, among the
+    latest ``window_size`` calls (and at least ``minimum_calls``), the share
+    of failures reaches ``failure_rate`` or the share of calls slower than
+    ``slow_call_duration`` reaches ``slow_call_rate``. Failures are transport
+    errors and 5xx responses. While open, requests raise ``CircuitOpenError``
+    without being sent; after ``reset_timeout`` seconds up to
+    ``half_open_calls`` probes are let through, and the circuit closes once
+    they all succeed or opens again on the first failure.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_rate: float = 1.0,
+        slow_call_duration: Optional[float] = None,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_duration = slow_call_duration
+        self.window_size = window_size
+        self.minimum_calls = min(minimum_calls, window_size)
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        # Called with (key, old_state, new_state) on every state change
+        self.listeners: List[Callable[[str, str, str], None]] = []
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, key: str) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit(self.window_size)
+        return circuit
+
+    def _transition(self, key: str, circuit: _Circuit, state: str, changes: list):
+        changes.append((key, circuit.state, state))
+        circuit.state = state
+        circuit.probes = 0
+        circuit.successes = 0
+        if state == OPEN:
+            circuit.opened_at = time.monotonic()
+        elif state == CLOSED:
+            circuit.outcomes.clear()
+
+    def _notify(self, changes: list):
+        for change in changes:
+            for listener in self.listeners:
+                listener(*change)
+
+    def before(self, key: str):
+        """
+        Admit a call on the circuit ``key``, or raise ``CircuitOpenError``
+        """
+        changes: list = []
+        try:
+            with self._lock:
+                circuit = self._circuit(key)
+                if circuit.state == OPEN:
+                    retry_after = (
+                        circuit.opened_at + self.reset_timeout - time.monotonic()
+                    )
+                    if retry_after > 0:
+                        circuit.rejected += 1
+                        raise CircuitOpenError(key, retry_after)
+                    self._transition(key, circuit, HALF_OPEN, changes)
+
+                if circuit.state == HALF_OPEN:
+                    if circuit.probes >= self.half_open_calls:
+                        circuit.rejected += 1
+                        raise CircuitOpenError(key, 0.0)
+                    circuit.probes += 1
+        finally:
+            self._notify(changes)
+
+    def record(self, key: str, failed: bool, duration: float):
+        """
+        Record the outcome of a call admitted by ``before``
+        """
+        slow = (
+            self.slow_call_duration is not None and duration >= self.slow_call_duration
+        )
+        changes: list = []
+        with self._lock:
+            circuit = self._circuit(key)
+            if circuit.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(key, circuit, OPEN, changes)
+                else:
+                    circuit.successes += 1
+                    if circuit.successes >= self.half_open_calls:
+                        self._transition(key, circuit, CLOSED, changes)
+            elif circuit.state == CLOSED:
+                outcomes = circuit.outcomes
+                outcomes.append((failed, slow))
+                calls = len(outcomes)
+                if calls >= self.minimum_calls:
+                    failures = sum(outcome[0] for outcome in outcomes)
+                    slow_calls = sum(outcome[1] for outcome in outcomes)
+                    if (
+                        failures >= self.failure_rate * calls
+                        or slow_calls >= self.slow_call_rate * calls
+                    ):
+                        self._transition(key, circuit, OPEN, changes)
+        self._notify(changes)
+
+    def release(self, key: str):
+        """
+        Give back the probe slot of a call that ended without an outcome,
+        e.g. when it was cancelled
+        """
+        with self._lock:
+            circuit = self._circuit(key)
+            if circuit.state == HALF_OPEN and circuit.probes > 0:
+                circuit.probes -= 1
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return CLOSED if circuit is None else circuit.state
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Return the state of every circuit, keyed by environment and resource
+        """
+        with self._lock:
+            return {
+                key: {
+                    "state": circuit.state,
+                    "calls": len(circuit.outcomes),
+                    "failures": sum(outcome[0] for outcome in circuit.outcomes),
+                    "slow_calls": sum(outcome[1] for outcome in circuit.outcomes),
+                    "rejected": circuit.rejected,
+                }
+                for key, circuit in self._circuits.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._circuits.clear()
@@ -1,115 +1,754 @@
-import dataclasses
-from typing import List, Optional
+import time
+import uuid
+from functools import cached_property
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import requests
 
 from billit.utils.payment_utils import PaidInvoice
 from billit.utils.tax_utils import Tax
 
+from . import deadline, schema, upsert
 from .auth import BillitAuthentication
+from .bulk import DEFAULT_CONCURRENCY, BulkResult, run_bulk
+from .cache import (
+    MISS,
+    ResponseCache,
+    ValidatorStore,
+    cache_key,
+    cache_scope,
+    resource_of,
+)
+from .circuit import SERVER_ERROR_STATUS, CircuitBreaker, circuit_key
+from .codec import JSONCodec, default_codec
 from .constants import (
+    NOT_MODIFIED_STATUS,
+    PRECONDITION_FAILED_STATUS,
     PRODUCTION_BASE_URL,
     PRODUCTION_ENVIRONMENT,
     SANDBOX_BASE_URL,
     SANDBOX_ENVIRONMENT,
 )
-from .exceptions import APIError, AuthenticationError, InvalidEnvironment
+from .exceptions import (
+    APIError,
+    AuthenticationError,
+    ConflictError,
+    DeadlineExceeded,
+    InvalidEnvironment,
+)
+from .export import NDJSON, export
+from .instrumentation import Instrumentation, RequestEvent
+from .models import MODELS, Model, as_dict, decode
+from .pagination import Page, paginate
+from .ratelimit import RATE_LIMITED_STATUS, RateLimiter
+from .retry import IDEMPOTENT_METHODS, RetryPolicy
+from .schema import Schema
+from .singleflight import SingleFlight
+from .transport import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TIMEOUT,
+    Timeout,
+    Transport,
+)
+
+# Marks an option of ``with_options`` left as it is on the client
+_KEEP: Any = object()
+
 
+def base_url_for(environment) -> str:
+    if environment not in [PRODUCTION_ENVIRONMENT, SANDBOX_ENVIRONMENT]:
+        raise InvalidEnvironment(environment)
 
-class Client:
+    if environment == PRODUCTION_ENVIRONMENT:
+        return PRODUCTION_BASE_URL
+    return SANDBOX_BASE_URL
+
+
+def unwrap_record(body):
+    """
+    Return the record of a single-record response, without its ``data`` envelope
+    """
+    if isinstance(body, dict):
+        data = body.get("data")
+        if isinstance(data, (dict, Model)):
+            return data
+    return body
+
+
+class _Call:
+    """
+    A request being sent, with the state of its current attempt
+    """
+
+    # Set once the attempt is sent, unset while waiting to send it
+    started: Optional[float]
+    # Set once the attempt is reported to the client's instrumentation
+    instrumentation: Optional[Instrumentation]
+    event: Optional[RequestEvent]
+
+    def __init__(self, method, endpoint, params, headers, body, entry, circuit):
+        self.method = method
+        self.endpoint = endpoint
+        self.params = params
+        self.headers = headers
+        self.body = body
+        self.entry = entry
+        self.circuit = circuit
+        self.attempt = 0
+        self.started = None
+        self.instrumentation = None
+        self.event = None
+
+
+class BaseClient:
     """
     Base client for all API clients
     """
 
-    def __init__(self, api_key, environment=PRODUCTION_ENVIRONMENT):
+    # Transport errors after which a request may be retried
+    _retryable_errors: tuple = ()
+
+    def __init__(
+        self,
+        api_key,
+        environment=PRODUCTION_ENVIRONMENT,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorStore] = None,
+        response_models: bool = False,
+        codec: Optional[JSONCodec] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        validate: bool = False,
+    ):
         self.api_key = api_key
-        self.account = Account(self)
-        self.invoices = Invoices(self)
-        self.customers = Customers(self)
-        self.contacts = Contacts(self)
-        self.ocp = OCP(self)
-        self.products = Products(self)
-        self.tags = Tags(self)
-        self.purchases = Purchases(self)
-        self.payments = Payments(self)
-
-        if environment not in [PRODUCTION_ENVIRONMENT, SANDBOX_ENVIRONMENT]:
-            raise InvalidEnvironment(environment)
-
-        if environment == PRODUCTION_ENVIRONMENT:
-            self.base_url = PRODUCTION_BASE_URL
-        else:
-            self.base_url = SANDBOX_BASE_URL
+        self.auth = BillitAuthentication(api_key)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.validators = validators
+        self.response_models = response_models
+        self.codec = codec if codec is not None else default_codec()
+        self.instrumentation = instrumentation
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        # Check request arguments against their schema before sending them
+        self.validate = validate
+        if instrumentation is not None and instrumentation.circuit_breaker is None:
+            instrumentation.circuit_breaker = circuit_breaker
+        self.base_url = base_url_for(environment)
+        self.cache_scope = cache_scope(self.base_url, api_key)
+        self._owns_transport = False
+
+    def with_options(self, timeout=_KEEP, environment=None):
+        """
+        Return a view of the client with other options, e.g.
+        ``client.with_options(timeout=5).invoices.show(uuid)``.
+
+        The view shares the transport and its connection pool, the caches, the
+        rate limiter and the instrumentation of the client; deriving one copies
+        no state and opens no connections, so one can be made per request from
+        a client shared across threads. Closing a view leaves the pool open.
+        """
+        view = object.__new__(type(self))
+        view.__dict__.update(
+            (name, value)
+            for name, value in self.__dict__.items()
+            if not isinstance(value, SubClient)
+        )
+        view._owns_transport = False
+        if timeout is not _KEEP:
+            view.timeout = timeout
+        if environment is not None:
+            view.base_url = base_url_for(environment)
+            view.cache_scope = cache_scope(view.base_url, view.api_key)
+        return view
+
+    def _handle_request(self, method, endpoint, params=None, data=None, headers=None):
+        raise NotImplementedError
+
+    def _request_headers(self, method) -> dict:
+        headers = {}
+        if (
+            self.retry_policy is not None
+            and self.retry_policy.idempotency_header is not None
+            and method not in IDEMPOTENT_METHODS
+        ):
+            headers[self.retry_policy.idempotency_header] = uuid.uuid4().hex
+
+        return headers
+
+    def _known_record(self, endpoint):
+        """
+        Return the locally known version of a record, from the stored validators
+        or the response cache, along with the precondition headers that guard
+        against it having changed on the server since
+        """
+        preconditions = {}
+        body = None
+        entry = None
+        if self.validators is not None:
+            entry = self.validators.get(self.cache_scope, endpoint)
+        if entry is not None:
+            body = entry["body"]
+            if entry["etag"] is not None:
+                preconditions["If-Match"] = entry["etag"]
+            elif entry["last_modified"] is not None:
+                preconditions["If-Unmodified-Since"] = entry["last_modified"]
+        elif self.cache is not None:
+            cached = self.cache.get(self.cache_scope, endpoint)
+            if cached is not MISS:
+                body = cached
+
+        return unwrap_record(body), preconditions
+
+    def _decode_models(self, endpoint, result):
+        model = MODELS.get(resource_of(endpoint))
+        if model is None:
+            return result
+
+        return decode(model, result)
+
+    def _conditional_headers(self, method, endpoint, params, headers) -> Optional[dict]:
+        """
+        Add the stored validators of a GET request to its headers, returning
+        the stored entry they come from
+        """
+        if self.validators is None:
+            return None
 
-    def _handle_response(self, response):
-        if response.status_code == 401:
-            raise AuthenticationError(response.json()["message"], response.status_code)
+        if method != "GET":
+            self.validators.invalidate(self.cache_scope, endpoint)
+            return None
 
-        if response.status_code == 204:
+        entry = self.validators.get(self.cache_scope, endpoint, params)
+        if entry is not None:
+            if entry["etag"] is not None:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"] is not None:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        return entry
+
+    def _handle_conditional_response(
+        self, method, endpoint, params, response, entry: Optional[dict]
+    ):
+        if response.status_code == NOT_MODIFIED_STATUS and entry is not None:
+            return entry["body"]
+
+        result = self._handle_response(response)
+        if self.validators is not None and method == "GET":
+            self.validators.set(
+                self.cache_scope, endpoint, params, response.headers, result
+            )
+        return result
+
+    def _retry_delay(self, method, attempt: int, response=None) -> Optional[float]:
+        """
+        Return how long to wait before retrying, or None when the outcome of the
+        attempt is final
+        """
+        if response is not None and self.rate_limiter is not None:
+            self.rate_limiter.update(response.status_code, response.headers)
+            if response.status_code == RATE_LIMITED_STATUS:
+                # The limiter itself holds the next request back until the server allows it
+                return 0.0 if attempt < self.rate_limiter.max_retries else None
+
+        if self.retry_policy is None:
             return None
 
+        return self.retry_policy.delay(method, attempt, response)
+
+    def _prepare_call(self, method, endpoint, params, data, headers) -> _Call:
+        headers = {**self._request_headers(method), **(headers or {})}
+        entry = self._conditional_headers(method, endpoint, params, headers)
+        body = self._encode_body(data, headers)
+        circuit = circuit_key(self.base_url, endpoint)
+        return _Call(method, endpoint, params, headers, body, entry, circuit)
+
+    def _admit_attempt(self, call: _Call) -> float:
+        """
+        Let an attempt through the circuit breaker and take a rate limiter
+        token for it, returning how long to wait before sending it
+        """
+        call.started = None
+        call.instrumentation = None
+        call.event = None
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before(call.circuit)
+        if self.rate_limiter is None:
+            return 0.0
+
+        wait = self.rate_limiter.reserve(deadline.remaining())
+        if wait is None:
+            if breaker is not None:
+                breaker.release(call.circuit)
+            raise DeadlineExceeded()
+        return wait
+
+    def _start_attempt(self, call: _Call):
+        """
+        Record that an attempt is being sent, returning its timeout
+        """
+        timeout = deadline.bound_timeout(self.timeout)
+        call.started = time.monotonic()
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            # A failing before_request hook leaves the attempt unreported
+            call.event = instrumentation.start(
+                call.method,
+                call.endpoint,
+                call.attempt,
+                call.headers,
+                len(call.body or b""),
+            )
+            call.instrumentation = instrumentation
+        return timeout
+
+    def _attempt_failed(self, call: _Call, error: BaseException) -> Optional[float]:
+        """
+        Record an attempt that raised ``error``, returning how long to wait
+        before retrying, or None when the error is final
+        """
+        breaker = self.circuit_breaker
+        if call.started is None:
+            # Interrupted before it was sent
+            if breaker is not None:
+                breaker.release(call.circuit)
+            return None
+
+        if call.instrumentation is not None and call.event is not None:
+            call.instrumentation.finish(call.event, error=error)
+        if not isinstance(error, self._retryable_errors):
+            if breaker is not None:
+                breaker.release(call.circuit)
+            return None
+
+        if breaker is not None:
+            breaker.record(call.circuit, True, time.monotonic() - call.started)
+        delay = self._retry_delay(call.method, call.attempt)
+        if delay is None:
+            deadline.check()
+            return None
+        return self._next_attempt(call, delay)
+
+    def _attempt_succeeded(self, call: _Call, response) -> Optional[float]:
+        """
+        Record the response of an attempt, returning how long to wait before
+        retrying, or None when the response is final
+        """
+        if call.instrumentation is not None and call.event is not None:
+            call.instrumentation.finish(call.event, response)
+        if self.circuit_breaker is not None:
+            assert call.started is not None
+            self.circuit_breaker.record(
+                call.circuit,
+                response.status_code >= SERVER_ERROR_STATUS,
+                time.monotonic() - call.started,
+            )
+        delay = self._retry_delay(call.method, call.attempt, response)
+        if delay is None:
+            return None
+        return self._next_attempt(call, delay)
+
+    def _next_attempt(self, call: _Call, delay: float) -> float:
+        call.attempt += 1
+        deadline.bound_delay(delay)
+        return delay
+
+    def _encode_body(self, data, headers):
+        if data is None:
+            return None
+
+        headers["Content-Type"] = self.codec.content_type
+        return self.codec.dumps(data)
+
+    def _handle_response(self, response):
+        if response.status_code in (204, NOT_MODIFIED_STATUS):
+            return None
+
+        # The body is decoded exactly once, for both the success and error paths
+        content = response.content
         try:
-            response.raise_for_status()
-
-            return response.json()
-        except:
-            error = f"{response.text}"
-            if "application/json" in response.headers["Content-Type"]:
-                resp = response.json()
-                if "message" in resp:
-                    error = f"Message: {resp.get('message')} , Error details: {resp.get('errors')}, {resp.get('data')}"
-                    raise APIError(error, response)
-
-                elif "msg" in resp:
-                    error = f"Message: {resp.get('msg')} , Error details: {resp.get('errors')}, {resp.get('data')}"
-                    raise APIError(error, response)
-
-            raise APIError(error, response)
-
-    def _handle_request(self, method, endpoint, params=None, data=None):
-        url = self.base_url + endpoint
-        response = requests.request(
-            method,
-            url,
-            params=params,
-            json=data,
-            auth=BillitAuthentication(self.api_key),
+            payload = self.codec.loads(content) if content else None
+            decoded = True
+        except Exception:
+            payload = None
+            decoded = False
+
+        if response.status_code == 401:
+            message = response.text
+            if isinstance(payload, dict) and "message" in payload:
+                message = payload["message"]
+            raise AuthenticationError(message, response)
+
+        if response.status_code < 400 and decoded:
+            return payload
+
+        error = f"{response.text}"
+        if isinstance(payload, dict) and "application/json" in response.headers.get(
+            "Content-Type", ""
+        ):
+            if "message" in payload:
+                error = f"Message: {payload.get('message')} , Error details: {payload.get('errors')}, {payload.get('data')}"
+            elif "msg" in payload:
+                error = f"Message: {payload.get('msg')} , Error details: {payload.get('errors')}, {payload.get('data')}"
+
+        if response.status_code == PRECONDITION_FAILED_STATUS:
+            raise ConflictError(error, response)
+
+        raise APIError(error, response)
+
+
+class Client(BaseClient):
+    """
+    Synchronous Billit API client
+    """
+
+    _retryable_errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(
+        self,
+        api_key,
+        environment=PRODUCTION_ENVIRONMENT,
+        transport=None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorStore] = None,
+        response_models: bool = False,
+        codec: Optional[JSONCodec] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce: bool = False,
+        validate: bool = False,
+    ):
+        super().__init__(
+            api_key,
+            environment,
+            rate_limiter,
+            retry_policy,
+            cache,
+            validators,
+            response_models,
+            codec,
+            instrumentation,
+            timeout,
+            circuit_breaker,
+            validate,
         )
-        return self._handle_response(response)
+        self._owns_transport = transport is None
+        self.single_flight = SingleFlight() if coalesce else None
+        self.transport = (
+            transport
+            if transport is not None
+            else Transport(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        )
+
+    # Sub-clients are created on first use, so that clients and their views
+    # are cheap to make
+    @cached_property
+    def account(self) -> "Account":
+        return Account(self)
+
+    @cached_property
+    def invoices(self) -> "Invoices":
+        return Invoices(self)
+
+    @cached_property
+    def customers(self) -> "Customers":
+        return Customers(self)
+
+    @cached_property
+    def contacts(self) -> "Contacts":
+        return Contacts(self)
+
+    @cached_property
+    def ocp(self) -> "OCP":
+        return OCP(self)
+
+    @cached_property
+    def products(self) -> "Products":
+        return Products(self)
+
+    @cached_property
+    def tags(self) -> "Tags":
+        return Tags(self)
+
+    @cached_property
+    def purchases(self) -> "Purchases":
+        return Purchases(self)
+
+    @cached_property
+    def payments(self) -> "Payments":
+        return Payments(self)
+
+    def close(self):
+        """
+        Release pooled connections, unless the transport was passed in by the caller
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def export(
+        self,
+        resource: str,
+        path: str,
+        format: str = NDJSON,
+        checkpoint: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        **filters,
+    ) -> int:
+        """
+        Stream every record of ``resource`` (e.g. ``"invoices"``) to an NDJSON or
+        CSV file with bounded memory, optionally resuming from ``checkpoint``.
+        See ``billit.export.export``.
+        """
+        return export(self, resource, path, format, checkpoint, columns, **filters)
+
+    def _handle_request(self, method, endpoint, params=None, data=None, headers=None):
+        result = self._cached_request(method, endpoint, params, data, headers)
+        if self.response_models:
+            return self._decode_models(endpoint, result)
+        return result
+
+    def _cached_request(self, method, endpoint, params=None, data=None, headers=None):
+        if self.cache is None:
+            if method == "GET":
+                return self._coalesced_request(method, endpoint, params, headers)
+            return self._send_request(method, endpoint, params, data, headers)
+
+        if method != "GET":
+            try:
+                return self._send_request(method, endpoint, params, data, headers)
+            finally:
+                self.cache.invalidate(self.cache_scope, endpoint)
+
+        result = self.cache.get(self.cache_scope, endpoint, params)
+        if result is MISS:
+            result = self._coalesced_request(method, endpoint, params, headers)
+        return result
+
+    def _coalesced_request(self, method, endpoint, params=None, headers=None):
+        def fetch():
+            result = self._send_request(method, endpoint, params, None, headers)
+            if self.cache is not None:
+                self.cache.set(self.cache_scope, endpoint, params, result)
+            return result
+
+        if self.single_flight is None or headers:
+            return fetch()
+
+        # Identical GETs in flight at the same time share a single request
+        key = cache_key(self.cache_scope, endpoint, params)
+        return self.single_flight.do(key, fetch)
+
+    def _send_request(self, method, endpoint, params=None, data=None, headers=None):
+        call = self._prepare_call(method, endpoint, params, data, headers)
+        while True:
+            wait = self._admit_attempt(call)
+            try:
+                if wait > 0:
+                    time.sleep(wait)
+                timeout = self._start_attempt(call)
+                response = self.transport.request(
+                    method,
+                    self.base_url + endpoint,
+                    params=params,
+                    data=call.body,
+                    headers=call.headers,
+                    auth=self.auth,
+                    timeout=timeout,
+                )
+            except BaseException as e:
+                delay = self._attempt_failed(call, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._attempt_succeeded(call, response)
+                if delay is None:
+                    return self._handle_conditional_response(
+                        method, endpoint, params, response, call.entry
+                    )
+
+            time.sleep(delay)
 
 
 class SubClient:
-    client: Client
+    client: BaseClient
 
-    def __init__(self, client: Client):
+    def __init__(self, client: BaseClient):
         self.client = client
 
+    def _list_params(
+        self, page: Optional[int] = None, per_page: Optional[int] = None, **params
+    ) -> dict:
+        return {"page": page, "per_page": per_page, **params}
+
+    def _dump(self, resource_schema: Schema, values: dict) -> dict:
+        if self.client.validate:
+            resource_schema.validate(values)
+        return resource_schema.dump(values)
+
+    def _dump_partial(self, resource_schema: Schema, values: dict) -> dict:
+        if self.client.validate:
+            resource_schema.validate(values, partial=True)
+        return resource_schema.dump_partial(values)
+
+
+class ListableSubClient(SubClient):
+    """
+    Sub-client of a resource with a paginated list endpoint
+    """
+
+    _list_endpoint: str
+
+    def _fetch_page(self, params: dict):
+        return lambda number: self.client._handle_request(
+            "GET", self._list_endpoint, params={**params, "page": number}
+        )
+
+    def iter_pages(
+        self, start_page: int = 1, prefetch: bool = True, **filters
+    ) -> Iterator[Page]:
+        """
+        Iterate over the pages of the list endpoint, following the pagination
+        metadata. Keyword arguments are the filters accepted by ``list``; any
+        other keyword is sent as an extra query parameter.
+        """
+        fetch = self._fetch_page(self._list_params(**filters))
+        return paginate(fetch, start_page, prefetch)
+
+    def iter_all(self, start_page: int = 1, prefetch: bool = True, **filters):
+        """
+        Lazily iterate over every record of the list endpoint, page by page
+        """
+        for page in self.iter_pages(start_page, prefetch, **filters):
+            yield from page.records
+
+
+class UpdatableSubClient(ListableSubClient):
+    """
+    Sub-client of a resource whose records can be updated field by field
+    """
+
+    _update_schema: Schema
+
+    def patch(self, resource_id, **changes):
+        """
+        Update only the given fields of a record, sending a PATCH request with
+        just those fields, e.g. ``client.contacts.patch(1, phone="2101234567")``
+        """
+        data = self._dump_partial(self._update_schema, changes)
+        return self.client._handle_request(
+            "PATCH", f"{self._list_endpoint}/{resource_id}", data=data
+        )
+
+    def _field_changes(self, resource_id, current, changes):
+        endpoint = f"{self._list_endpoint}/{resource_id}"
+        known, headers = self.client._known_record(endpoint)
+        if current is not None:
+            known = as_dict(current)
+
+        data = self._dump_partial(self._update_schema, changes)
+        if isinstance(known, dict):
+            data = {k: v for k, v in data.items() if k not in known or known[k] != v}
+        return endpoint, known, data, headers
+
+    def update_fields(self, resource_id, current=None, **changes):
+        """
+        Update only the fields of a record that differ from its locally known
+        version, e.g. ``client.contacts.update_fields(1, phone="2101234567")``.
+
+        The known version is ``current`` when given, or else the record as last
+        fetched through the client's validator store or response cache; no
+        request is made when nothing changed. When the known version carries an
+        ``ETag`` or ``Last-Modified`` validator, the update is made conditional
+        on it and raises ``ConflictError`` if the record changed meanwhile.
+
+        Either way, the updated record is returned without the ``data``
+        envelope of the API response.
+        """
+        endpoint, known, data, headers = self._field_changes(
+            resource_id, current, changes
+        )
+        if not data:
+            if self.client.response_models:
+                return self.client._decode_models(endpoint, known)
+            return known
+
+        return unwrap_record(
+            self.client._handle_request("PATCH", endpoint, data=data, headers=headers)
+        )
+
+
+class UpsertableSubClient(UpdatableSubClient):
+    """
+    Sub-client of a resource whose records can be created or updated in bulk
+    """
+
+    # Fields identifying an existing record in ``upsert_many``, by API name
+    _upsert_keys: Dict[str, str]
+
+    def _upsert_plan(self, rows, existing) -> List[upsert.UpsertResult]:
+        return upsert.plan(rows, existing, self._upsert_keys, self._update_schema)
+
+    def _upsert_write(self, planned: upsert.UpsertResult):
+        if planned.action == upsert.CREATE:
+            return self.create(**planned.row)  # type: ignore[attr-defined]
+        return self.patch(planned.record_id, **planned.changes)
+
+    def upsert_many(
+        self,
+        rows: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        existing: Optional[Iterable[Any]] = None,
+        **filters,
+    ) -> upsert.UpsertReport:
+        """
+        Create or update records in bulk, from dicts of ``create`` keyword arguments.
+
+        Existing records are fetched once with ``iter_all(**filters)``, unless
+        given as ``existing``, and every row is matched locally against them.
+        Unmatched rows are created, matched rows are patched with just the
+        fields that differ, and the rest are left alone; only the needed writes
+        are sent, with at most ``concurrency`` in flight.
+        """
+        if existing is None:
+            existing = self.iter_all(**filters)
+        planned = self._upsert_plan(rows, existing)
+        writes = [p for p in planned if p.action in (upsert.CREATE, upsert.UPDATE)]
+        for outcome in run_bulk(self._upsert_write, writes, concurrency):
+            outcome.item.result, outcome.item.error = outcome.result, outcome.error
+        return upsert.UpsertReport(planned)
+
 
 class Account(SubClient):
     def my(self):
         return self.client._handle_request("GET", "/account")
 
 
-class Invoices(SubClient):
-    _args_api_mappings = {
-        "customer_id": "customerId",
-        "send_mail": "sendMail",
-        "exclude_mydata": "excludeMydata",
-        "invoice_date": "invoiceDate",
-        "invoice_type_id": "invoiceTypeId",
-        "is_paid": "isPaid",
-        "mydata_invoice_type": "mydataInvoiceType",
-        "taxes": "taxes",
-        "products": "products",
-        "tags": "tags",
-        "mydata_payment": "mydataPayment",
-        "mail_options": "mailOptions",
-        "reminder": "reminder",
-        "payment_method": "paymentMethod",
-    }
-
-    def list(self):
-        return self.client._handle_request("GET", "/invoices")
+class Invoices(UpdatableSubClient):
+    _list_endpoint = "/invoices"
+    _args_api_mappings = schema.INVOICE.mappings
+    _update_schema = schema.INVOICE_UPDATE
+
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/invoices", params=params)
 
     def create(
         self,
@@ -128,27 +767,27 @@ class Invoices(SubClient):
         reminder: bool,
         payment_method: List[str],
     ):
-        data = {
-            self._args_api_mappings["customer_id"]: customer_id,
-            self._args_api_mappings["send_mail"]: send_mail,
-            self._args_api_mappings["exclude_mydata"]: exclude_mydata,
-            self._args_api_mappings["invoice_date"]: invoice_date,
-            self._args_api_mappings["invoice_type_id"]: invoice_type_id,
-            self._args_api_mappings["is_paid"]: is_paid,
-            self._args_api_mappings["mydata_invoice_type"]: mydata_invoice_type,
-            self._args_api_mappings["taxes"]: [
-                dataclasses.asdict(tax) for tax in taxes
-            ],
-            self._args_api_mappings["products"]: products,
-            self._args_api_mappings["tags"]: tags,
-            self._args_api_mappings["mydata_payment"]: mydata_payment,
-            self._args_api_mappings["mail_options"]: mail_options,
-            self._args_api_mappings["reminder"]: reminder,
-            self._args_api_mappings["payment_method"]: payment_method,
-        }
+        data = self._dump(schema.INVOICE, locals())
 
         return self.client._handle_request("POST", "/invoices", data=data)
 
+    def create_many(
+        self,
+        invoices: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Iterator[BulkResult]:
+        """
+        Create invoices in parallel, with at most ``concurrency`` requests in flight.
+
+        Each item is a dict of ``create`` keyword arguments. A ``BulkResult`` is
+        yielded per item, in input order or in completion order when ``ordered``
+        is false; a failed invoice carries its error instead of aborting the batch.
+        """
+        return run_bulk(
+            lambda invoice: self.create(**invoice), invoices, concurrency, ordered
+        )
+
     def show(self, uuid):
         return self.client._handle_request("GET", f"/invoices/{uuid}")
 
@@ -166,20 +805,7 @@ class Invoices(SubClient):
         tags: List,
         mydata_payment: dict,
     ):
-        data = {
-            self._args_api_mappings["customer_id"]: customer_id,
-            self._args_api_mappings["send_mail"]: send_mail,
-            self._args_api_mappings["exclude_mydata"]: exclude_mydata,
-            self._args_api_mappings["invoice_date"]: invoice_date,
-            self._args_api_mappings["invoice_type_id"]: invoice_type_id,
-            self._args_api_mappings["mydata_invoice_type"]: mydata_invoice_type,
-            self._args_api_mappings["taxes"]: [
-                dataclasses.asdict(tax) for tax in taxes
-            ],
-            self._args_api_mappings["products"]: products,
-            self._args_api_mappings["tags"]: tags,
-            self._args_api_mappings["mydata_payment"]: mydata_payment,
-        }
+        data = self._dump(schema.INVOICE_UPDATE, locals())
 
         return self.client._handle_request("PUT", f"/invoices/{uuid}", data=data)
 
@@ -187,35 +813,19 @@ class Invoices(SubClient):
         return self.client._handle_request("DELETE", f"/invoices/{uuid}")
 
 
-class Customers(SubClient):
+class Customers(UpsertableSubClient):
+    _list_endpoint = "/customers"
     DOMESTIC_CUSTOMER: int = 1
     INTRA_COMMUNITY_CUSTOMER: int = 2
     FOREIGN_CUSTOMER: int = 3
     PRIVATE_INDIVIDUAL: int = 4
-    _args_api_mappings = {
-        "is_company": "isCompany",
-        "company": "company",
-        "lang": "lang",
-        "profession": "profession",
-        "in_charge": "inCharge",
-        "vat_id": "vatId",
-        "tax_office": "taxOffice",
-        "street_address": "streetAddress",
-        "alias": "alias",
-        "customer_type": "customerType",
-        "postal_code": "postalCode",
-        "city": "city",
-        "country": "country",
-        "mobile": "mobile",
-        "phone": "phone",
-        "fax": "fax",
-        "info": "info",
-        "public_note": "publicNote",
-        "addresses": "addresses",
-    }
-
-    def list(self):
-        return self.client._handle_request("GET", "/customers")
+    _args_api_mappings = schema.CUSTOMER.mappings
+    _update_schema = schema.CUSTOMER
+    _upsert_keys = schema.CUSTOMER.only("vat_id", "alias").mappings
+
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/customers", params=params)
 
     def show(self, customer_id: int):
         return self.client._handle_request("GET", f"/customers/{customer_id}")
@@ -242,28 +852,8 @@ class Customers(SubClient):
         public_note: str,
         addresses: List,
     ):
-        data = {
-            self._args_api_mappings["is_company"]: is_company,
-            self._args_api_mappings["company"]: company,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["profession"]: profession,
-            self._args_api_mappings["in_charge"]: in_charge,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["tax_office"]: tax_office,
-            self._args_api_mappings["street_address"]: street_address,
-            self._args_api_mappings["alias"]: alias,
-            self._args_api_mappings["customer_type"]: customer_type,
-            self._args_api_mappings["postal_code"]: postal_code,
-            self._args_api_mappings["city"]: city,
-            self._args_api_mappings["country"]: country,
-            self._args_api_mappings["mobile"]: mobile,
-            self._args_api_mappings["phone"]: phone,
-            self._args_api_mappings["fax"]: fax,
-            self._args_api_mappings["info"]: info,
-            self._args_api_mappings["public_note"]: public_note,
-            self._args_api_mappings["addresses"]: addresses,
-        }
-        print(data)
+        data = self._dump(schema.CUSTOMER, locals())
+
         return self.client._handle_request("POST", "/customers", data=data)
 
     def update(
@@ -289,27 +879,7 @@ class Customers(SubClient):
         public_note: str,
         addresses: List,
     ):
-        data = {
-            self._args_api_mappings["is_company"]: is_company,
-            self._args_api_mappings["company"]: company,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["profession"]: profession,
-            self._args_api_mappings["in_charge"]: in_charge,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["tax_office"]: tax_office,
-            self._args_api_mappings["street_address"]: street_address,
-            self._args_api_mappings["alias"]: alias,
-            self._args_api_mappings["customer_type"]: customer_type,
-            self._args_api_mappings["postal_code"]: postal_code,
-            self._args_api_mappings["city"]: city,
-            self._args_api_mappings["country"]: country,
-            self._args_api_mappings["mobile"]: mobile,
-            self._args_api_mappings["phone"]: phone,
-            self._args_api_mappings["fax"]: fax,
-            self._args_api_mappings["info"]: info,
-            self._args_api_mappings["public_note"]: public_note,
-            self._args_api_mappings["addresses"]: addresses,
-        }
+        data = self._dump(schema.CUSTOMER, locals())
 
         return self.client._handle_request(
             "PUT", f"/customers/{customer_id}", data=data
@@ -319,7 +889,8 @@ class Customers(SubClient):
         return self.client._handle_request("DELETE", f"/customers/{customer_id}")
 
 
-class Contacts(SubClient):
+class Contacts(UpsertableSubClient):
+    _list_endpoint = "/contacts"
     DOMESTIC_CUSTOMER: int = 1
     INTRA_COMMUNITY_CUSTOMER: int = 2
     FOREIGN_CUSTOMER: int = 3
@@ -327,48 +898,47 @@ class Contacts(SubClient):
     CUSTOMER: int = 1
     SUPPLIER: int = 2
     CUSTOMER_AND_SUPPLIER: int = 3
-    _args_api_mappings = {
-        "is_company": "isCompany",
-        "company": "company",
-        "lang": "lang",
-        "profession": "profession",
-        "in_charge": "inCharge",
-        "vat_id": "vatId",
-        "tax_office": "taxOffice",
-        "street_address": "streetAddress",
-        "alias": "alias",
-        "customer_type": "customerType",
-        "postal_code": "postalCode",
-        "city": "city",
-        "country": "country",
-        "mobile": "mobile",
-        "phone": "phone",
-        "fax": "fax",
-        "info": "info",
-        "public_note": "publicNote",
-        "contact_type": "contactType",
-        "currency": "currency",
-        "addresses": "addresses",
-        "email": "email",
-        "tags": "tags",
-        "default_vat_id": "defaultVatId",
-    }
+    _args_api_mappings = schema.CONTACT.mappings
+    _update_schema = schema.CONTACT_UPDATE
+    _upsert_keys = schema.CONTACT.only("vat_id", "email", "alias").mappings
 
-    def list(
+    def _list_params(
         self,
-        per_page: int = 25,
+        page: Optional[int] = None,
+        per_page: Optional[int] = 25,
         with_relations: bool = True,
         q: str = "",
         tag_id: Optional[int] = None,
         unpaid: Optional[bool] = None,
-    ):
-        params = {
+        **params,
+    ) -> dict:
+        return {
+            "page": page,
             "per_page": per_page,
             "withRelations": "1" if with_relations else "0",
             "q": q,
             "tagId": tag_id,
             "unpaid": "1" if unpaid else "0",
+            **params,
         }
+
+    def list(
+        self,
+        per_page: int = 25,
+        with_relations: bool = True,
+        q: str = "",
+        tag_id: Optional[int] = None,
+        unpaid: Optional[bool] = None,
+        page: Optional[int] = None,
+    ):
+        params = self._list_params(
+            page=page,
+            per_page=per_page,
+            with_relations=with_relations,
+            q=q,
+            tag_id=tag_id,
+            unpaid=unpaid,
+        )
         return self.client._handle_request("GET", "/contacts", params=params)
 
     def show(self, contact_id: int):
@@ -401,32 +971,7 @@ class Contacts(SubClient):
         tags: List[str] = [],
         default_vat_id: Optional[int] = None,
     ):
-        data = {
-            self._args_api_mappings["is_company"]: is_company,
-            self._args_api_mappings["company"]: company,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["profession"]: profession,
-            self._args_api_mappings["in_charge"]: in_charge,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["tax_office"]: tax_office,
-            self._args_api_mappings["street_address"]: street_address,
-            self._args_api_mappings["alias"]: alias,
-            self._args_api_mappings["customer_type"]: customer_type,
-            self._args_api_mappings["postal_code"]: postal_code,
-            self._args_api_mappings["city"]: city,
-            self._args_api_mappings["country"]: country,
-            self._args_api_mappings["mobile"]: mobile,
-            self._args_api_mappings["phone"]: phone,
-            self._args_api_mappings["fax"]: fax,
-            self._args_api_mappings["info"]: info,
-            self._args_api_mappings["public_note"]: public_note,
-            self._args_api_mappings["contact_type"]: contact_type,
-            self._args_api_mappings["currency"]: currency,
-            self._args_api_mappings["addresses"]: addresses,
-            self._args_api_mappings["email"]: email,
-            self._args_api_mappings["tags"]: tags,
-            self._args_api_mappings["default_vat_id"]: default_vat_id,
-        }
+        data = self._dump(schema.CONTACT, locals())
 
         return self.client._handle_request("POST", "/contacts", data=data)
 
@@ -455,29 +1000,7 @@ class Contacts(SubClient):
         currency: str,
         addresses: List,
     ):
-        data = {
-            self._args_api_mappings["is_company"]: is_company,
-            self._args_api_mappings["company"]: company,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["profession"]: profession,
-            self._args_api_mappings["in_charge"]: in_charge,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["tax_office"]: tax_office,
-            self._args_api_mappings["street_address"]: street_address,
-            self._args_api_mappings["alias"]: alias,
-            self._args_api_mappings["customer_type"]: customer_type,
-            self._args_api_mappings["postal_code"]: postal_code,
-            self._args_api_mappings["city"]: city,
-            self._args_api_mappings["country"]: country,
-            self._args_api_mappings["mobile"]: mobile,
-            self._args_api_mappings["phone"]: phone,
-            self._args_api_mappings["fax"]: fax,
-            self._args_api_mappings["info"]: info,
-            self._args_api_mappings["public_note"]: public_note,
-            self._args_api_mappings["contact_type"]: contact_type,
-            self._args_api_mappings["currency"]: currency,
-            self._args_api_mappings["addresses"]: addresses,
-        }
+        data = self._dump(schema.CONTACT_UPDATE, locals())
 
         return self.client._handle_request("PUT", f"/contacts/{contact_id}", data=data)
 
@@ -485,23 +1008,14 @@ class Contacts(SubClient):
         return self.client._handle_request("DELETE", f"/contacts/{contact_id}")
 
 
-class OCP(SubClient):
-    _args_api_mappings = {
-        "title": "title",
-        "description": "description",
-        "cost": "cost",
-        "customer_id": "customerId",
-        "invoice_type_id": "invoiceTypeId",
-        "net_value": "netValue",
-        "vat_id": "vatId",
-        "product_id": "productId",
-        "payment_method_id": "paymentMethodId",
-        "lang": "lang",
-        "expiration_at": "expirationAt",
-    }
-
-    def list(self):
-        return self.client._handle_request("GET", "/ocps")
+class OCP(UpdatableSubClient):
+    _list_endpoint = "/ocps"
+    _args_api_mappings = schema.OCP.mappings
+    _update_schema = schema.OCP
+
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/ocps", params=params)
 
     def show(self, ocp_id: str):
         return self.client._handle_request("GET", f"/ocps/{ocp_id}")
@@ -520,19 +1034,7 @@ class OCP(SubClient):
         lang: str,
         expiration_at: str,
     ):
-        data = {
-            self._args_api_mappings["title"]: title,
-            self._args_api_mappings["description"]: description,
-            self._args_api_mappings["cost"]: cost,
-            self._args_api_mappings["customer_id"]: customer_id,
-            self._args_api_mappings["invoice_type_id"]: invoice_type_id,
-            self._args_api_mappings["net_value"]: net_value,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["product_id"]: product_id,
-            self._args_api_mappings["payment_method_id"]: payment_method_id,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["expiration_at"]: expiration_at,
-        }
+        data = self._dump(schema.OCP, locals())
 
         return self.client._handle_request("POST", "/ocps", data=data)
 
@@ -551,19 +1053,7 @@ class OCP(SubClient):
         lang: str,
         expiration_at: str,
     ):
-        data = {
-            self._args_api_mappings["title"]: title,
-            self._args_api_mappings["description"]: description,
-            self._args_api_mappings["cost"]: cost,
-            self._args_api_mappings["customer_id"]: customer_id,
-            self._args_api_mappings["invoice_type_id"]: invoice_type_id,
-            self._args_api_mappings["net_value"]: net_value,
-            self._args_api_mappings["vat_id"]: vat_id,
-            self._args_api_mappings["product_id"]: product_id,
-            self._args_api_mappings["payment_method_id"]: payment_method_id,
-            self._args_api_mappings["lang"]: lang,
-            self._args_api_mappings["expiration_at"]: expiration_at,
-        }
+        data = self._dump(schema.OCP, locals())
 
         return self.client._handle_request("PUT", f"/ocps/{ocp_id}", data=data)
 
@@ -571,22 +1061,14 @@ class OCP(SubClient):
         return self.client._handle_request("DELETE", f"/ocps/{ocp_id}")
 
 
-class Products(SubClient):
-    _args_api_mappings = {
-        "name": "name",
-        "description": "description",
-        "name_sec": "nameSec",
-        "description_sec": "descriptionSec",
-        "unit_price": "unitPrice",
-        "default_vat_id": "defaultVatId",
-        "stock": "stock",
-        "with_stock": "withStock",
-        "is_vat_included": "isVatIncluded",
-        "active": "active",
-    }
+class Products(UpdatableSubClient):
+    _list_endpoint = "/products"
+    _args_api_mappings = schema.PRODUCT.mappings
+    _update_schema = schema.PRODUCT
 
-    def list(self):
-        return self.client._handle_request("GET", "/products")
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/products", params=params)
 
     def show(self, product_id: str):
         return self.client._handle_request("GET", f"/products/{product_id}")
@@ -604,18 +1086,7 @@ class Products(SubClient):
         is_vat_included: bool,
         active: bool,
     ):
-        data = {
-            self._args_api_mappings["name"]: name,
-            self._args_api_mappings["description"]: description,
-            self._args_api_mappings["name_sec"]: name_sec,
-            self._args_api_mappings["description_sec"]: description_sec,
-            self._args_api_mappings["unit_price"]: unit_price,
-            self._args_api_mappings["default_vat_id"]: default_vat_id,
-            self._args_api_mappings["stock"]: stock,
-            self._args_api_mappings["with_stock"]: with_stock,
-            self._args_api_mappings["is_vat_included"]: is_vat_included,
-            self._args_api_mappings["active"]: active,
-        }
+        data = self._dump(schema.PRODUCT, locals())
 
         return self.client._handle_request("POST", "/products", data=data)
 
@@ -633,18 +1104,7 @@ class Products(SubClient):
         is_vat_included: bool,
         active: bool,
     ):
-        data = {
-            self._args_api_mappings["name"]: name,
-            self._args_api_mappings["description"]: description,
-            self._args_api_mappings["name_sec"]: name_sec,
-            self._args_api_mappings["description_sec"]: description_sec,
-            self._args_api_mappings["unit_price"]: unit_price,
-            self._args_api_mappings["default_vat_id"]: default_vat_id,
-            self._args_api_mappings["stock"]: stock,
-            self._args_api_mappings["with_stock"]: with_stock,
-            self._args_api_mappings["is_vat_included"]: is_vat_included,
-            self._args_api_mappings["active"]: active,
-        }
+        data = self._dump(schema.PRODUCT, locals())
 
         return self.client._handle_request("PUT", f"/products/{product_id}", data=data)
 
@@ -652,9 +1112,12 @@ class Products(SubClient):
         return self.client._handle_request("DELETE", f"/products/{product_id}")
 
 
-class Tags(SubClient):
-    def list(self):
-        return self.client._handle_request("GET", "/tags")
+class Tags(ListableSubClient):
+    _list_endpoint = "/tags"
+
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/tags", params=params)
 
     def show(self, tag_id: str):
         return self.client._handle_request("GET", f"/tags/{tag_id}")
@@ -663,19 +1126,13 @@ class Tags(SubClient):
         return self.client._handle_request("DELETE", f"/tags/{tag_id}")
 
 
-class Purchases(SubClient):
-    _args_api_mappings = {
-        "supplier_id": "supplierId",
-        "invoice_num": "invoiceNum",
-        "vat_amount": "vatAmount",
-        "clean_amount": "cleanAmount",
-        "date_occurred": "dateOccurred",
-        "irs_amount": "irsAmount",
-        "irs_type": "irsType",
-    }
+class Purchases(ListableSubClient):
+    _list_endpoint = "/purchases"
+    _args_api_mappings = schema.PURCHASE.mappings
 
-    def list(self):
-        return self.client._handle_request("GET", "/purchases")
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/purchases", params=params)
 
     def show(self, purchase_id: str):
         return self.client._handle_request("GET", f"/purchases/{purchase_id}")
@@ -690,15 +1147,7 @@ class Purchases(SubClient):
         irs_amount: int,
         irs_type: int,
     ):
-        data = {
-            self._args_api_mappings["supplier_id"]: supplier_id,
-            self._args_api_mappings["invoice_num"]: invoice_num,
-            self._args_api_mappings["vat_amount"]: vat_amount,
-            self._args_api_mappings["clean_amount"]: clean_amount,
-            self._args_api_mappings["date_occurred"]: date_occurred,
-            self._args_api_mappings["irs_amount"]: irs_amount,
-            self._args_api_mappings["irs_type"]: irs_type,
-        }
+        data = self._dump(schema.PURCHASE, locals())
 
         return self.client._handle_request("POST", "/purchases", data=data)
 
@@ -706,20 +1155,13 @@ class Purchases(SubClient):
         return self.client._handle_request("DELETE", f"/purchases/{purchase_id}")
 
 
-class Payments(SubClient):
-    _args_api_mappings = {
-        "customer_id": "customerId",
-        "date_occurred": "dateOccurred",
-        "amount": "amount",
-        "payment_method": "paymentMethod",
-        "payment_type": "paymentType",
-        "amount_left_over": "amountLeftOver",
-        "selections_amount": "selectionsAmount",
-        "invoices_paid": "invoicesPaid",
-    }
+class Payments(ListableSubClient):
+    _list_endpoint = "/payments"
+    _args_api_mappings = schema.PAYMENT.mappings
 
-    def list(self):
-        return self.client._handle_request("GET", "/payments")
+    def list(self, page: Optional[int] = None, per_page: Optional[int] = None):
+        params = self._list_params(page=page, per_page=per_page)
+        return self.client._handle_request("GET", "/payments", params=params)
 
     def create(
         self,
@@ -732,15 +1174,20 @@ class Payments(SubClient):
         selections_amount: int,
         invoices_paid: List[PaidInvoice],
     ):
-        data = {
-            self._args_api_mappings["customer_id"]: customer_id,
-            self._args_api_mappings["date_occurred"]: date_occurred,
-            self._args_api_mappings["amount"]: amount,
-            self._args_api_mappings["payment_method"]: payment_method,
-            self._args_api_mappings["payment_type"]: payment_type,
-            self._args_api_mappings["amount_left_over"]: amount_left_over,
-            self._args_api_mappings["selections_amount"]: selections_amount,
-            self._args_api_mappings["invoices_paid"]: invoices_paid,
-        }
+        data = self._dump(schema.PAYMENT, locals())
 
         return self.client._handle_request("POST", "/payments", data=data)
+
+    def create_many(
+        self,
+        payments: Iterable[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Iterator[BulkResult]:
+        """
+        Create payments in parallel, with at most ``concurrency`` requests in
+        flight, e.g. the payments of a ``billit.reconcile.Reconciliation``
+        """
+        return run_bulk(
+            lambda payment: self.create(**payment), payments, concurrency, ordered
+        )
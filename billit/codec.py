@@ -0,0 +1,79 @@
+import json
+from decimal import Decimal
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgspec  # type: ignore
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore
+
+
+class JSONCodec:
+    """
+    JSON codec based on the standard library, used when no faster one is installed
+    """
+
+    content_type = "application/json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson")
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("MsgspecCodec requires msgspec")
+
+        # Decimals are numbers, as with the other codecs, rather than strings
+        self._encoder = msgspec.json.Encoder(enc_hook=_default, decimal_format="number")
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes):
+        return self._decoder.decode(data)
+
+
+def _default(obj):
+    # Dataclasses such as Tax and PaidInvoice serialize as plain objects
+    fields = getattr(obj, "__dataclass_fields__", None)
+    if fields is not None:
+        return {name: getattr(obj, name) for name in fields}
+
+    # Decimal amounts are sent as numbers: integers when whole, floats otherwise
+    if isinstance(obj, Decimal) and obj.is_finite():
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def default_codec() -> JSONCodec:
+    """
+    Return the fastest codec available, preferring orjson, then msgspec, then
+    the standard library
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if msgspec is not None:
+        return MsgspecCodec()
+    return JSONCodec()
@@ -2,3 +2,17 @@ SANDBOX_BASE_URL = "https://api.sandbox-billit.xyz/v1"
 PRODUCTION_BASE_URL = "https://api.billit.io/v1"
 PRODUCTION_ENVIRONMENT = "production"
 SANDBOX_ENVIRONMENT = "sandbox"
+NOT_MODIFIED_STATUS = 304
+PRECONDITION_FAILED_STATUS = 412
+
+# Resources with a list endpoint, mapped to the client attribute serving them
+LIST_RESOURCES = {
+    "contacts": "contacts",
+    "customers": "customers",
+    "invoices": "invoices",
+    "ocps": "ocp",
+    "payments": "payments",
+    "products": "products",
+    "purchases": "purchases",
+    "tags": "tags",
+}
@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from .exceptions import DeadlineExceeded
+
+_expires_at: ContextVar[Optional[float]] = ContextVar(
+    "billit_deadline_expires_at", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Bound every request made within the block, including retries, pagination
+    and bulk operations, to ``seconds`` from now:
+
+        with deadline(30):
+            for invoice in client.invoices.iter_all():
+                ...
+
+    Request timeouts are shortened to the time left and ``DeadlineExceeded``
+    is raised once it runs out. Nested deadlines never extend an outer one.
+    The deadline follows the context into asyncio tasks and into the worker
+    threads of the client.
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _expires_at.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+
+    token = _expires_at.set(expires_at)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Return the seconds left before the current deadline, or ``None`` without one
+    """
+    expires_at = _expires_at.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def check():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+def bound_timeout(timeout):
+    """
+    Shorten a request timeout, a number or a ``(connect, read)`` pair, to the
+    time left before the current deadline
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return tuple(left if part is None else min(part, left) for part in timeout)
+    return min(timeout, left)
+
+
+def bound_delay(delay: float):
+    """
+    Raise ``DeadlineExceeded`` if waiting ``delay`` seconds would overrun the
+    current deadline
+    """
+    left = remaining()
+    if left is not None and delay >= left:
+        raise DeadlineExceeded()
@@ -19,6 +19,53 @@ class APIError(Error):
     pass
 
 
+class ConflictError(APIError):
+    """
+    The record changed on the server since the version a conditional update
+    was based on
+    """
+
+
+class CircuitOpenError(Error):
+    """
+    A request was not sent because the circuit breaker of its resource is open
+    """
+
+    def __init__(self, circuit: str, retry_after: float):
+        super().__init__(f"Circuit {circuit} is open")
+        self.circuit = circuit
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return f"{self.message}, retry in {self.retry_after:.1f}s"
+
+
+class ValidationError(Error):
+    """
+    A request was not sent because its arguments are invalid. ``errors`` maps
+    the names of the invalid arguments to their error messages.
+    """
+
+    def __init__(self, errors: dict):
+        super().__init__("Invalid arguments")
+        self.errors = errors
+
+    def __str__(self) -> str:
+        fields = "; ".join(
+            f"{name}: {', '.join(messages)}" for name, messages in self.errors.items()
+        )
+        return f"{self.message}: {fields}"
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    The deadline of an operation passed before it completed
+    """
+
+    def __str__(self) -> str:
+        return "Deadline exceeded"
+
+
 class InvalidEnvironment(Exception):
     def __init__(self, environment):
         self.environment = environment
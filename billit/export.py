@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+import os
+from typing import List, Optional
+
+from .constants import LIST_RESOURCES
+from .models import as_dict
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def _check_columns(columns: List[str], records: List[dict], page: int):
+    known = set(columns)
+    for record in records:
+        unknown = [key for key in record if key not in known]
+        if unknown:
+            raise ValueError(
+                f"Record on page {page} has keys missing from the CSV columns: "
+                f"{', '.join(unknown)}; pass columns= to choose them explicitly"
+            )
+
+
+def _load_checkpoint(path: Optional[str]) -> Optional[dict]:
+    if path is None or not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path: str, state: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def export(
+    client,
+    resource: str,
+    path: str,
+    format: str = NDJSON,
+    checkpoint: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    **filters,
+) -> int:
+    """
+    Write every record of ``resource`` to ``path`` as NDJSON or CSV, one page at
+    a time, and return the number of records in the file.
+
+    CSV files have the given ``columns``, and keys of records outside them are
+    left out. Without ``columns``, they are the keys of the first record, and
+    a later record with any other key raises ``ValueError`` before its page is
+    written, rather than losing data; export again with explicit ``columns``.
+
+    When ``checkpoint`` is given, progress is recorded there after every page,
+    so that an interrupted export resumes after the last completed page instead
+    of starting over. The checkpoint is removed once the export completes.
+    """
+    if resource not in LIST_RESOURCES:
+        raise ValueError(f"Unknown resource: {resource}")
+    if format not in (NDJSON, CSV):
+        raise ValueError(f"Unknown export format: {format}")
+
+    state: Optional[dict] = _load_checkpoint(checkpoint)
+    if state is not None and (state["resource"], state["format"]) != (
+        resource,
+        format,
+    ):
+        raise ValueError(f"Checkpoint {checkpoint} belongs to a different export")
+
+    if state is None:
+        state = {
+            "resource": resource,
+            "format": format,
+            "next_page": 1,
+            "offset": 0,
+            "records": 0,
+            "columns": None,
+            "strict": columns is None,
+        }
+        f = open(path, "wb")
+    else:
+        f = open(path, "r+b")
+        f.truncate(state["offset"])
+        f.seek(state["offset"])
+
+    sub_client = getattr(client, LIST_RESOURCES[resource])
+    with f:
+        for page in sub_client.iter_pages(start_page=state["next_page"], **filters):
+            records = [as_dict(record) for record in page.records]
+            if format == NDJSON:
+                chunk = b"".join(
+                    client.codec.dumps(record) + b"\n" for record in records
+                )
+            else:
+                buffer = io.StringIO()
+                if records:
+                    header = state["columns"] is None
+                    if header:
+                        state["columns"] = list(columns or records[0])
+                    if state.get("strict", True):
+                        _check_columns(state["columns"], records, page.number)
+                    writer = csv.DictWriter(
+                        buffer, state["columns"], extrasaction="ignore"
+                    )
+                    if header:
+                        writer.writeheader()
+                    for record in records:
+                        writer.writerow({k: _csv_value(v) for k, v in record.items()})
+                chunk = buffer.getvalue().encode()
+
+            f.write(chunk)
+            state["offset"] += len(chunk)
+            state["records"] += len(records)
+            state["next_page"] = page.number + 1
+            if checkpoint is not None:
+                f.flush()
+                os.fsync(f.fileno())
+                _save_checkpoint(checkpoint, state)
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    return state["records"]
@@ -0,0 +1,210 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I
+)
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Replace the identifiers of an endpoint with placeholders, e.g.
+    ``/invoices/{uuid}`` for ``/invoices/5d0f...``
+    """
+    segments = endpoint.split("/")
+    for i, segment in enumerate(segments[2:], start=2):
+        segments[i] = "{uuid}" if _UUID_RE.match(segment) else "{id}"
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """
+    A single attempt of a request, passed to the before/after request hooks.
+
+    Hooks may add entries to ``headers`` before the request is sent.
+    """
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "template",
+        "attempt",
+        "headers",
+        "bytes_sent",
+        "started_at",
+        "duration",
+        "status_code",
+        "bytes_received",
+        "error",
+        "span",
+    )
+
+    def __init__(self, method, endpoint, attempt, headers, bytes_sent):
+        self.method = method
+        self.endpoint = endpoint
+        self.template = endpoint_template(endpoint)
+        self.attempt = attempt
+        self.headers = headers
+        self.bytes_sent = bytes_sent
+        self.started_at = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.bytes_received = 0
+        self.error: Optional[BaseException] = None
+        self.span = None
+
+
+class EndpointStats:
+    """
+    Counters and latency histogram of a single method and endpoint template
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.requests = 0
+        self.retries = 0
+        self.transport_errors = 0
+        self.statuses: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+        # One count per bucket upper bound, plus one for slower requests
+        self.latency_counts = [0] * (len(buckets) + 1)
+
+    def record(self, event: RequestEvent):
+        self.requests += 1
+        if event.attempt > 0:
+            self.retries += 1
+        if event.error is not None:
+            self.transport_errors += 1
+        if event.status_code is not None:
+            self.statuses[event.status_code] = (
+                self.statuses.get(event.status_code, 0) + 1
+            )
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        duration = event.duration or 0.0
+        self.latency_sum += duration
+        self.latency_counts[bisect_left(self.buckets, duration)] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency quantile as the upper bound of the bucket holding it
+        """
+        if not self.requests:
+            return None
+
+        rank = q * self.requests
+        seen = 0
+        for bound, count in zip(self.buckets, self.latency_counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "transport_errors": self.transport_errors,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_sum": self.latency_sum,
+            "latency_buckets": dict(
+                zip([*map(str, self.buckets), "+Inf"], self.latency_counts)
+            ),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Instrumentation:
+    """
+    Request hooks, per-endpoint metrics and optional tracing for a client.
+
+    ``tracer`` may be any OpenTelemetry-compatible tracer; a span is started
+    for every attempt. Clients without instrumentation pay no cost for it.
+    The state of the client's circuit breaker, if any, is reported by
+    ``circuits``.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        tracer=None,
+        circuit_breaker=None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.tracer = tracer
+        self.circuit_breaker = circuit_breaker
+        self.before_request: List[Callable[[RequestEvent], None]] = []
+        self.after_request: List[Callable[[RequestEvent], None]] = []
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def start(self, method, endpoint, attempt, headers, bytes_sent) -> RequestEvent:
+        event = RequestEvent(method, endpoint, attempt, headers, bytes_sent)
+        if self.tracer is not None:
+            event.span = self.tracer.start_span(
+                f"billit {method} {event.template}",
+                attributes={
+                    "http.request.method": method,
+                    "url.template": event.template,
+                    "http.request.resend_count": attempt,
+                },
+            )
+        for hook in self.before_request:
+            hook(event)
+        return event
+
+    def finish(self, event: RequestEvent, response=None, error=None):
+        event.duration = time.perf_counter() - event.started_at
+        event.error = error
+        if response is not None:
+            event.status_code = response.status_code
+            event.bytes_received = len(response.content)
+
+        with self._lock:
+            key = (event.method, event.template)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(self.buckets)
+            stats.record(event)
+
+        if event.span is not None:
+            if event.status_code is not None:
+                event.span.set_attribute("http.response.status_code", event.status_code)
+            if error is not None:
+                event.span.record_exception(error)
+            event.span.end()
+
+        for hook in self.after_request:
+            hook(event)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Return the metrics collected so far, keyed by ``"METHOD /template"``
+        """
+        with self._lock:
+            return {
+                f"{method} {template}": stats.as_dict()
+                for (method, template), stats in self._stats.items()
+            }
+
+    def circuits(self) -> Dict[str, dict]:
+        """
+        Return the state of every circuit of the circuit breaker
+        """
+        if self.circuit_breaker is None:
+            return {}
+        return self.circuit_breaker.snapshot()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,304 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from billit.utils.tax_utils import Tax
+
+_UNSET: Any = object()
+
+
+class LazyField:
+    """
+    Descriptor decoding a nested value on first access.
+
+    The raw value is kept in a private slot and decoded the first time the
+    attribute is read; the decoded value is then kept alongside it.
+    """
+
+    def __init__(self, key: str, decoder: Callable[[Any], Any]):
+        self.key = key
+        self.decoder = decoder
+        self.slot = ""
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        raw, decoded = getattr(instance, self.slot)
+        if decoded is _UNSET:
+            decoded = None if raw is None else self.decoder(raw)
+            setattr(instance, self.slot, (raw, decoded))
+        return decoded
+
+
+class ModelMeta(type):
+    """
+    Derive ``__slots__`` from the ``fields`` and lazy fields declared on a model
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields: Dict[str, str] = namespace.get("fields", {})
+        lazy = {k: v for k, v in namespace.items() if isinstance(v, LazyField)}
+        namespace["__slots__"] = (
+            tuple(namespace.get("__slots__", ()))
+            + tuple(fields)
+            + tuple(f"_{name}" for name in lazy)
+        )
+        namespace["_lazy"] = tuple(lazy.items())
+        namespace["_keys"] = frozenset(fields.values()) | {
+            field.key for field in lazy.values()
+        }
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class Model(metaclass=ModelMeta):
+    """
+    Base class of the typed response models.
+
+    Scalar fields are stored in slots, nested structures are decoded lazily on
+    first access and keys unknown to the model are kept in ``extra``.
+    """
+
+    fields: Dict[str, str] = {}
+    extra: Optional[dict]
+    _lazy: Tuple[Tuple[str, LazyField], ...]
+    _keys: frozenset
+    __slots__ = ("extra",)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        instance = cls.__new__(cls)
+        for attribute, key in cls.fields.items():
+            setattr(instance, attribute, data.get(key))
+        for name, field in cls._lazy:
+            setattr(instance, field.slot, (data.get(field.key), _UNSET))
+        keys = cls._keys
+        instance.extra = {k: v for k, v in data.items() if k not in keys} or None
+        return instance
+
+    def to_dict(self) -> dict:
+        """
+        Return the record in the shape of the API response
+        """
+        data = dict(self.extra or {})
+        for attribute, key in self.fields.items():
+            data[key] = getattr(self, attribute)
+        for name, field in self._lazy:
+            raw, _ = getattr(self, field.slot)
+            data[field.key] = raw
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        id_ = getattr(self, "id", None)
+        return f"{type(self).__name__}(id={id_!r})"
+
+
+def as_dict(record):
+    """
+    Return a record as a plain dict, whether or not it was decoded into a model
+    """
+    return record.to_dict() if isinstance(record, Model) else record
+
+
+def _many(model):
+    return lambda items: [
+        model.from_dict(item) if isinstance(item, dict) else item for item in items
+    ]
+
+
+def _taxes(items):
+    return [Tax(item.get("taxId", 0), item.get("taxVatShow", 0)) for item in items]
+
+
+class Address(Model):
+    fields = {
+        "id": "id",
+        "street_address": "streetAddress",
+        "postal_code": "postalCode",
+        "city": "city",
+        "country": "country",
+    }
+
+
+class InvoiceProduct(Model):
+    fields = {
+        "id": "id",
+        "product_id": "productId",
+        "name": "name",
+        "description": "description",
+        "quantity": "quantity",
+        "unit_price": "unitPrice",
+        "vat_id": "vatId",
+        "tax_id": "taxId",
+        "net_value": "netValue",
+        "vat_value": "vatValue",
+        "total": "total",
+    }
+
+
+class Contact(Model):
+    fields = {
+        "id": "id",
+        "is_company": "isCompany",
+        "company": "company",
+        "lang": "lang",
+        "profession": "profession",
+        "in_charge": "inCharge",
+        "vat_id": "vatId",
+        "tax_office": "taxOffice",
+        "street_address": "streetAddress",
+        "alias": "alias",
+        "customer_type": "customerType",
+        "postal_code": "postalCode",
+        "city": "city",
+        "country": "country",
+        "mobile": "mobile",
+        "phone": "phone",
+        "fax": "fax",
+        "info": "info",
+        "public_note": "publicNote",
+        "contact_type": "contactType",
+        "currency": "currency",
+        "email": "email",
+        "default_vat_id": "defaultVatId",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+    addresses = LazyField("addresses", _many(Address))
+    tags = LazyField("tags", list)
+
+
+class Customer(Model):
+    fields = {
+        "id": "id",
+        "is_company": "isCompany",
+        "company": "company",
+        "lang": "lang",
+        "profession": "profession",
+        "in_charge": "inCharge",
+        "vat_id": "vatId",
+        "tax_office": "taxOffice",
+        "street_address": "streetAddress",
+        "alias": "alias",
+        "customer_type": "customerType",
+        "postal_code": "postalCode",
+        "city": "city",
+        "country": "country",
+        "mobile": "mobile",
+        "phone": "phone",
+        "fax": "fax",
+        "info": "info",
+        "public_note": "publicNote",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+    addresses = LazyField("addresses", _many(Address))
+
+
+class Invoice(Model):
+    fields = {
+        "id": "id",
+        "uuid": "uuid",
+        "customer_id": "customerId",
+        "invoice_date": "invoiceDate",
+        "invoice_type_id": "invoiceTypeId",
+        "is_paid": "isPaid",
+        "mydata_invoice_type": "mydataInvoiceType",
+        "payment_method": "paymentMethod",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+    customer = LazyField("customer", Contact.from_dict)
+    products = LazyField("products", _many(InvoiceProduct))
+    taxes = LazyField("taxes", _taxes)
+    tags = LazyField("tags", list)
+
+
+class Product(Model):
+    fields = {
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "name_sec": "nameSec",
+        "description_sec": "descriptionSec",
+        "unit_price": "unitPrice",
+        "default_vat_id": "defaultVatId",
+        "stock": "stock",
+        "with_stock": "withStock",
+        "is_vat_included": "isVatIncluded",
+        "active": "active",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+
+
+class Purchase(Model):
+    fields = {
+        "id": "id",
+        "supplier_id": "supplierId",
+        "invoice_num": "invoiceNum",
+        "vat_amount": "vatAmount",
+        "clean_amount": "cleanAmount",
+        "date_occurred": "dateOccurred",
+        "irs_amount": "irsAmount",
+        "irs_type": "irsType",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+    supplier = LazyField("supplier", Contact.from_dict)
+
+
+class Payment(Model):
+    fields = {
+        "id": "id",
+        "customer_id": "customerId",
+        "date_occurred": "dateOccurred",
+        "amount": "amount",
+        "payment_method": "paymentMethod",
+        "payment_type": "paymentType",
+        "amount_left_over": "amountLeftOver",
+        "selections_amount": "selectionsAmount",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    }
+    invoices_paid = LazyField("invoicesPaid", list)
+
+
+MODELS = {
+    "contacts": Contact,
+    "customers": Customer,
+    "invoices": Invoice,
+    "payments": Payment,
+    "products": Product,
+    "purchases": Purchase,
+}
+
+
+def decode(model, response):
+    """
+    Convert the records of a response into instances of ``model``, keeping
+    the surrounding pagination envelope, if any, as a plain dict
+    """
+    if isinstance(response, list):
+        return _many(model)(response)
+
+    if not isinstance(response, dict):
+        return response
+
+    data = response.get("data", _UNSET)
+    if data is _UNSET:
+        return model.from_dict(response)
+
+    if isinstance(data, list):
+        return {**response, "data": _many(model)(data)}
+
+    if isinstance(data, dict):
+        return {**response, "data": model.from_dict(data)}
+
+    return response
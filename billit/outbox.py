@@ -0,0 +1,444 @@
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import requests
+
+from . import schema
+from .bulk import DEFAULT_CONCURRENCY, run_bulk
+from .codec import default_codec
+from .exceptions import APIError, CircuitOpenError
+from .retry import DEFAULT_RETRY_STATUSES, IDEMPOTENCY_HEADER
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+SENT = "sent"
+FAILED = "failed"
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 10
+
+# Write operations that can be queued, with their method, endpoint and schema
+OPERATIONS: Dict[str, Tuple[str, str, schema.Schema]] = {
+    "invoices.create": ("POST", "/invoices", schema.INVOICE),
+    "payments.create": ("POST", "/payments", schema.PAYMENT),
+    "purchases.create": ("POST", "/purchases", schema.PURCHASE),
+}
+
+
+@dataclass
+class DispatchResult:
+    """
+    Summary of a single dispatch run of the outbox
+    """
+
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    operation: str
+    payload: Any
+    idempotency_key: str
+    status: str
+    attempts: int
+    result: Any
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+
+# Errors worth retrying besides retryable API responses: transport errors,
+# timeouts, deadlines and open circuits
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    TimeoutError,
+    CircuitOpenError,
+)
+
+
+def _is_transient(error: Optional[BaseException]) -> bool:
+    if isinstance(error, APIError):
+        return error.response.status_code in DEFAULT_RETRY_STATUSES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class Outbox:
+    """
+    Durable SQLite queue of write operations, sent to Billit by a dispatcher.
+
+    ``enqueue`` builds the request payload, assigns it an idempotency key and
+    commits it locally, without any network I/O. ``dispatch`` sends pending
+    entries in batches, with bounded concurrency, and records the outcome of
+    each one: entries failing transiently are retried with backoff, up to
+    ``max_attempts``, while rejected ones are marked failed. Entries left in
+    flight by a crashed dispatcher are replayed by ``recover`` with their
+    original idempotency key, so that the API can drop duplicates.
+
+    Producers may open the outbox without a client; only dispatchers need one,
+    and it must be a synchronous ``Client``. With ``validate``, which defaults
+    to the client's option, invalid entries raise ``ValidationError`` instead
+    of being queued.
+    """
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_factor: float = 1.0,
+        max_backoff: float = 300.0,
+        validate: Optional[bool] = None,
+    ):
+        self.client = client
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.codec = client.codec if client is not None else default_codec()
+        if validate is None:
+            validate = client is not None and client.validate
+        self.validate = validate
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Latest error of the background dispatcher
+        self.last_error: Optional[Exception] = None
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                operation TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS outbox_pending
+                ON outbox (status, next_attempt_at);
+            """
+        )
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._connection.close()
+
+    def enqueue(
+        self, operation: str, idempotency_key: Optional[str] = None, **fields
+    ) -> int:
+        """
+        Queue a write operation, e.g. ``enqueue("invoices.create", **invoice)``
+        with the keyword arguments of ``Invoices.create``, and return its id
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+
+        _, _, operation_schema = OPERATIONS[operation]
+        missing = [name for name in operation_schema.mappings if name not in fields]
+        if missing:
+            raise TypeError(f"Missing fields: {', '.join(missing)}")
+        if self.validate:
+            operation_schema.validate(fields)
+
+        payload = self.codec.dumps(operation_schema.dump(fields)).decode()
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO outbox (operation, payload, idempotency_key, status, "
+                "next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    operation,
+                    payload,
+                    idempotency_key or uuid.uuid4().hex,
+                    PENDING,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+        return cursor.lastrowid or 0
+
+    def recover(self) -> int:
+        """
+        Return the entries left in flight by a crashed dispatcher to the queue,
+        returning how many there were. Only call it while no other dispatcher
+        is running on the same outbox.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), IN_FLIGHT),
+            ).rowcount
+
+    def _claim(self, batch_size: int) -> list:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    "SELECT id, operation, payload, idempotency_key, attempts "
+                    "FROM outbox WHERE status = ? AND next_attempt_at <= ? "
+                    "ORDER BY id LIMIT ?",
+                    (PENDING, now, batch_size),
+                ).fetchall()
+                connection.executemany(
+                    "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                    [(IN_FLIGHT, now, row[0]) for row in rows],
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        return rows
+
+    def _send(self, row):
+        _, operation, payload, idempotency_key, _ = row
+        method, endpoint, _ = OPERATIONS[operation]
+        retry_policy = self.client.retry_policy
+        header = IDEMPOTENCY_HEADER
+        if retry_policy is not None and retry_policy.idempotency_header is not None:
+            header = retry_policy.idempotency_header
+
+        # The raw response is kept, whether or not the client decodes models
+        return self.client._cached_request(
+            method,
+            endpoint,
+            data=self.codec.loads(payload),
+            headers={header: idempotency_key},
+        )
+
+    def _dispatch_batch(
+        self, batch_size: int, concurrency: int, summary: DispatchResult
+    ) -> bool:
+        """
+        Send a batch of the entries due for sending, and return whether any was
+        """
+        rows = self._claim(batch_size)
+        if not rows:
+            return False
+
+        try:
+            self._record(rows, concurrency, summary)
+        except BaseException:
+            # Leave the batch to a later dispatch rather than in flight, which
+            # only ``recover`` would undo
+            try:
+                self._release(rows)
+            except Exception:
+                pass
+            raise
+        return True
+
+    def _record(self, rows: list, concurrency: int, summary: DispatchResult):
+        updates: list = []
+        for outcome in run_bulk(self._send, rows, concurrency):
+            id_, attempts = outcome.item[0], outcome.item[4] + 1
+            now = time.time()
+            if outcome.ok:
+                summary.sent += 1
+                result = outcome.result
+                if result is not None:
+                    result = self.codec.dumps(result).decode()
+                updates.append((SENT, attempts, now, result, None, now, id_))
+            elif _is_transient(outcome.error) and attempts < self.max_attempts:
+                summary.retried += 1
+                delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempts - 1))
+                updates.append(
+                    (PENDING, attempts, now + delay, None, str(outcome.error), now, id_)
+                )
+            else:
+                summary.failed += 1
+                updates.append(
+                    (FAILED, attempts, now, None, str(outcome.error), now, id_)
+                )
+
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "UPDATE outbox SET status = ?, attempts = ?, "
+                    "next_attempt_at = ?, result = ?, error = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    updates,
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _release(self, rows: list):
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE outbox SET status = ?, updated_at = ? "
+                "WHERE id = ? AND status = ?",
+                [(PENDING, now, row[0], IN_FLIGHT) for row in rows],
+            )
+
+    def dispatch(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> DispatchResult:
+        """
+        Send the entries due for sending, one batch at a time, until none is left
+        """
+        if self.client is None:
+            raise ValueError("Dispatching the outbox requires a client")
+
+        summary = DispatchResult()
+        while self._dispatch_batch(batch_size, concurrency, summary):
+            pass
+        return summary
+
+    def start(
+        self,
+        interval: float = 1.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        """
+        Recover entries left in flight, then dispatch the outbox in a background
+        thread every ``interval`` seconds until ``stop`` is called.
+
+        Errors of the dispatcher itself, e.g. the database being locked by
+        another process, do not stop it: the latest one is kept in
+        ``last_error`` and dispatching resumes after a backoff.
+        """
+        if self._thread is not None:
+            raise RuntimeError("The outbox dispatcher is already running")
+
+        if self.client is None:
+            raise ValueError("Dispatching the outbox requires a client")
+
+        self.recover()
+        self._stop.clear()
+
+        def run():
+            # Batches are sent back to back, checking for a stop between them
+            failures = 0
+            while not self._stop.is_set():
+                try:
+                    dispatched = self._dispatch_batch(
+                        batch_size, concurrency, DispatchResult()
+                    )
+                except Exception as e:
+                    self.last_error = e
+                    failures += 1
+                    self._stop.wait(
+                        min(self.max_backoff, self.backoff_factor * 2 ** (failures - 1))
+                    )
+                    continue
+                failures = 0
+                if not dispatched:
+                    self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="billit-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background dispatcher after its current batch
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def retry_failed(self) -> int:
+        """
+        Queue the failed entries again, e.g. after fixing the cause of their
+        rejection, returning how many there were
+        """
+        now = time.time()
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?, "
+                "updated_at = ? WHERE status = ?",
+                (PENDING, now, now, FAILED),
+            ).rowcount
+
+    def get(self, entry_id: int) -> Optional[OutboxEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, operation, payload, idempotency_key, status, attempts, "
+                "result, error, created_at, updated_at FROM outbox WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+        return None if row is None else self._entry(row)
+
+    def entries(self, status: Optional[str] = None) -> Iterator[OutboxEntry]:
+        sql = (
+            "SELECT id, operation, payload, idempotency_key, status, attempts, "
+            "result, error, created_at, updated_at FROM outbox"
+        )
+        args: tuple = ()
+        if status is not None:
+            sql += " WHERE status = ?"
+            args = (status,)
+
+        with self._lock:
+            rows = self._connection.execute(sql + " ORDER BY id", args).fetchall()
+        for row in rows:
+            yield self._entry(row)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of entries per status
+        """
+        with self._lock:
+            return dict(
+                self._connection.execute(
+                    "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+                ).fetchall()
+            )
+
+    def purge(self, before: Optional[float] = None) -> int:
+        """
+        Delete the sent entries last updated before the ``before`` timestamp,
+        or all of them, returning how many were deleted
+        """
+        sql = "DELETE FROM outbox WHERE status = ?"
+        args: tuple = (SENT,)
+        if before is not None:
+            sql += " AND updated_at < ?"
+            args += (before,)
+
+        with self._lock:
+            return self._connection.execute(sql, args).rowcount
+
+    def _entry(self, row) -> OutboxEntry:
+        payload, result = row[2], row[6]
+        return OutboxEntry(
+            row[0],
+            row[1],
+            self.codec.loads(payload),
+            row[3],
+            row[4],
+            row[5],
+            None if result is None else self.codec.loads(result),
+            row[7],
+            row[8],
+            row[9],
+        )
@@ -0,0 +1,109 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+
+
+@dataclass
+class Page:
+    """
+    A single page of a list endpoint
+    """
+
+    number: int
+    records: List[Any] = field(default_factory=list)
+    last_page: Optional[int] = None
+    total: Optional[int] = None
+    has_next: bool = False
+
+
+def parse_page(response, number: int) -> Page:
+    """
+    Build a ``Page`` out of a list response, following the pagination metadata
+    in either the flat (``current_page``/``next_page_url``) or the nested
+    (``meta``/``links``) layout. Responses without metadata are single pages.
+    """
+    if isinstance(response, list):
+        return Page(number, response)
+
+    if not isinstance(response, dict) or not isinstance(response.get("data"), list):
+        return Page(number, [] if response is None else [response])
+
+    meta = response.get("meta")
+    if not isinstance(meta, dict):
+        meta = response
+    links = response.get("links")
+    if not isinstance(links, dict):
+        links = {}
+    number = meta.get("current_page", number)
+    last_page = meta.get("last_page")
+
+    if "next_page_url" in response:
+        has_next = bool(response["next_page_url"])
+    elif "next" in links:
+        has_next = bool(links["next"])
+    else:
+        has_next = last_page is not None and number < last_page
+
+    return Page(number, response["data"], last_page, meta.get("total"), has_next)
+
+
+def paginate(
+    fetch: Callable[[int], Any], start_page: int = 1, prefetch: bool = True
+) -> Iterator[Page]:
+    """
+    Yield pages starting at ``start_page`` until the metadata reports no next
+    page. With ``prefetch``, the next page is requested in a background thread
+    while the current one is being consumed.
+    """
+    if not prefetch:
+        number = start_page
+        while True:
+            page = parse_page(fetch(number), number)
+            yield page
+            if not page.has_next:
+                return
+            number = page.number + 1
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future: Optional[Future] = executor.submit(
+            copy_context().run, fetch, start_page
+        )
+        number = start_page
+        try:
+            while future is not None:
+                page = parse_page(future.result(), number)
+                number = page.number + 1
+                future = (
+                    executor.submit(copy_context().run, fetch, number)
+                    if page.has_next
+                    else None
+                )
+                yield page
+        finally:
+            if future is not None:
+                future.cancel()
+
+
+async def paginate_async(
+    fetch: Callable[[int], Awaitable[Any]], start_page: int = 1, prefetch: bool = True
+) -> AsyncIterator[Page]:
+    """
+    Async counterpart of ``paginate``, prefetching the next page in a task
+    """
+    task: Optional[asyncio.Future] = asyncio.ensure_future(fetch(start_page))
+    number = start_page
+    try:
+        while task is not None:
+            page = parse_page(await task, number)
+            number = page.number + 1
+            task = None
+            if page.has_next and prefetch:
+                task = asyncio.ensure_future(fetch(number))
+            yield page
+            if page.has_next and task is None:
+                task = asyncio.ensure_future(fetch(number))
+    finally:
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+RATE_LIMITED_STATUS = 429
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header, given either in seconds or as an HTTP date
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Parse an ``X-RateLimit-Reset`` header, given either as a UNIX timestamp or
+    as a number of seconds, into a delay in seconds
+    """
+    if not value:
+        return None
+
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+
+    if reset > 1e9:
+        reset -= time.time()
+
+    return max(0.0, reset)
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the rate of requests sent to the Billit API.
+
+    A single instance can be shared by several clients, threads and asyncio
+    tasks. The effective rate adapts to the server's signals: it is halved on
+    every 429 response and grows back towards ``rate`` on success, while
+    ``Retry-After`` and ``X-RateLimit-*`` headers pause the bucket until the
+    server accepts requests again.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[int] = None,
+        max_retries: int = 5,
+        adaptive: bool = True,
+        min_rate: float = 0.5,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.max_retries = max_retries
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, rate)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token and return how long the caller has to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.burst), self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def _release(self):
+        with self._lock:
+            self._tokens = min(float(self.burst), self._tokens + 1)
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token and return how long to wait before using it, or None,
+        without taking one, if that would take longer than ``timeout``
+        """
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            self._release()
+            return None
+        return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a token. Return False at once, without taking one, if that
+        would take longer than ``timeout``.
+        """
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Adapt the bucket to a response, returning the delay imposed by the
+        server, if any
+        """
+        delay = None
+        if status_code == RATE_LIMITED_STATUS:
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if delay is None:
+                delay = parse_reset(headers.get("X-RateLimit-Reset"))
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            delay = parse_reset(headers.get("X-RateLimit-Reset"))
+
+        with self._lock:
+            now = time.monotonic()
+            if status_code == RATE_LIMITED_STATUS:
+                if self.adaptive:
+                    self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+                if delay is None:
+                    delay = 1 / self.rate
+            elif self.adaptive and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+            if delay is not None:
+                self._blocked_until = max(self._blocked_until, now + delay)
+
+        return delay
@@ -0,0 +1,300 @@
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from billit.utils.payment_utils import PaidInvoice
+
+from .models import as_dict
+from .upsert import NORMALIZERS
+
+REFERENCE = "reference"
+AMOUNT = "amount"
+OLDEST = "oldest"
+ON_ACCOUNT = "on_account"
+UNMATCHED = "unmatched"
+
+_TOKEN_RE = re.compile(r"[^\w\-/.]+")
+_ZERO = Decimal(0)
+
+
+def _decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _number(value: Decimal):
+    # Amounts are sent as JSON numbers: integers when whole, floats otherwise
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def _normalize_label(value: Any) -> str:
+    return str(value).strip().casefold()
+
+
+def _normalize_name(value: Any) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def unpaid_amount(invoice: dict) -> Decimal:
+    """
+    Return the amount still due on an invoice record: its ``unpaidAmount``, or
+    else its ``total``, or else the sum of the totals of its product lines
+    """
+    for key in ("unpaidAmount", "total"):
+        if invoice.get(key) is not None:
+            return _decimal(invoice[key])
+    products = invoice.get("products") or []
+    return sum((_decimal(as_dict(p).get("total") or 0) for p in products), _ZERO)
+
+
+@dataclass
+class BankLine:
+    """
+    A credit line of a bank statement. The payer is identified by
+    ``customer_id`` when known, or else by ``vat_id`` or ``name``.
+    """
+
+    amount: Any
+    date: str
+    reference: str = ""
+    customer_id: Optional[int] = None
+    vat_id: str = ""
+    name: str = ""
+
+
+@dataclass
+class Match:
+    """
+    Outcome of the reconciliation of a bank line. ``payment`` holds the
+    keyword arguments of ``Payments.create`` for the line, unless unmatched.
+    """
+
+    line: BankLine
+    method: str
+    customer_id: Optional[int] = None
+    payment: Optional[dict] = None
+
+
+@dataclass
+class Reconciliation:
+    """
+    Matches of every bank line, in input order
+    """
+
+    matches: List[Match] = field(default_factory=list)
+
+    @property
+    def payments(self) -> List[dict]:
+        return [m.payment for m in self.matches if m.payment is not None]
+
+    @property
+    def unmatched(self) -> List[BankLine]:
+        return [m.line for m in self.matches if m.payment is None]
+
+
+class _Open:
+    __slots__ = ("id", "label", "customer_id", "date", "unpaid", "order")
+
+    def __init__(self, id_, label, customer_id, date, unpaid: Decimal, order: int):
+        self.id = id_
+        self.label = label
+        self.customer_id = customer_id
+        self.date = date
+        self.unpaid = unpaid
+        self.order = order
+
+
+class Reconciler:
+    """
+    Match bank lines to unpaid invoices and build the matching payments.
+
+    Unpaid invoices are indexed once by customer, amount and reference (their
+    ``reference_fields``, e.g. the label), so matching a statement is a single
+    pass over its lines. Each credit line is matched, in date order, to:
+
+    - the invoices whose reference appears in the line's reference,
+    - or else a single open invoice of the payer for exactly the line's amount,
+      or of any customer when the payer is unknown and the amount is unique,
+    - or else the payer's oldest open invoices, until the amount is used up.
+
+    Amounts allocated by earlier lines are no longer due to later ones, and
+    any amount exceeding what is due is left over on the payment.
+    """
+
+    def __init__(
+        self,
+        invoices: Iterable[Any],
+        contacts: Iterable[Any] = (),
+        reference_fields: Tuple[str, ...] = ("label", "uuid"),
+    ):
+        self._by_reference: Dict[str, _Open] = {}
+        self._by_amount: Dict[tuple, List[_Open]] = {}
+        self._by_customer: Dict[Any, List[_Open]] = {}
+        self._customer_start: Dict[Any, int] = {}
+        self._by_vat_id: Dict[str, Any] = {}
+        self._by_name: Dict[str, Any] = {}
+
+        for order, record in enumerate(invoices):
+            record = as_dict(record)
+            if record.get("isPaid"):
+                continue
+            unpaid = unpaid_amount(record)
+            if unpaid <= 0:
+                continue
+            customer_id = record.get("customerId")
+            if customer_id is None:
+                customer_id = as_dict(record.get("customer") or {}).get("id")
+            invoice = _Open(
+                record.get("id"),
+                record.get("label"),
+                customer_id,
+                str(record.get("invoiceDate") or ""),
+                unpaid,
+                order,
+            )
+            for name in reference_fields:
+                if record.get(name) not in (None, ""):
+                    label = _normalize_label(record[name])
+                    self._by_reference.setdefault(label, invoice)
+            if customer_id is not None:
+                self._by_amount.setdefault((customer_id, unpaid), []).append(invoice)
+            self._by_amount.setdefault((None, unpaid), []).append(invoice)
+            self._by_customer.setdefault(customer_id, []).append(invoice)
+
+        for invoices_ in self._by_amount.values():
+            invoices_.sort(key=lambda invoice: (invoice.date, invoice.order))
+        for invoices_ in self._by_customer.values():
+            invoices_.sort(key=lambda invoice: (invoice.date, invoice.order))
+
+        names: Dict[str, set] = {}
+        for record in contacts:
+            record = as_dict(record)
+            if record.get("vatId"):
+                vat_id = NORMALIZERS["vat_id"](record["vatId"])
+                self._by_vat_id.setdefault(vat_id, record.get("id"))
+            for key in ("company", "alias"):
+                if record.get(key):
+                    names.setdefault(_normalize_name(record[key]), set()).add(
+                        record.get("id")
+                    )
+        # Names only identify a payer when no other contact shares them
+        self._by_name = {k: next(iter(v)) for k, v in names.items() if len(v) == 1}
+
+    @classmethod
+    def fetch(cls, client, **options) -> "Reconciler":
+        """
+        Load the contacts with unpaid invoices and their unpaid invoices once,
+        through a synchronous ``Client``
+        """
+        contacts = list(client.contacts.iter_all(unpaid=True, with_relations=False))
+        customer_ids = {as_dict(contact).get("id") for contact in contacts}
+        invoices = (
+            invoice
+            for invoice in client.invoices.iter_all()
+            if as_dict(invoice).get("customerId") in customer_ids
+        )
+        return cls(invoices, contacts, **options)
+
+    def _payer(self, line: BankLine):
+        if line.customer_id is not None:
+            return line.customer_id
+        if line.vat_id:
+            customer_id = self._by_vat_id.get(NORMALIZERS["vat_id"](line.vat_id))
+            if customer_id is not None:
+                return customer_id
+        if line.name:
+            return self._by_name.get(_normalize_name(line.name))
+        return None
+
+    def _referenced(self, line: BankLine) -> List[_Open]:
+        referenced: List[_Open] = []
+        text = _normalize_label(line.reference)
+        for token in [text, *_TOKEN_RE.split(text)]:
+            invoice = self._by_reference.get(token)
+            if invoice is not None and invoice.unpaid > 0:
+                if invoice not in referenced:
+                    referenced.append(invoice)
+        return referenced
+
+    def _exact(self, customer_id, amount: Decimal) -> Optional[_Open]:
+        candidates = self._by_amount.get((customer_id, amount), [])
+        # Drop the invoices whose amount due changed since they were indexed
+        candidates[:] = [invoice for invoice in candidates if invoice.unpaid == amount]
+        if customer_id is None and len(candidates) != 1:
+            return None
+        return candidates[0] if candidates else None
+
+    def _oldest(self, customer_id) -> List[_Open]:
+        invoices = self._by_customer.get(customer_id, [])
+        start = self._customer_start.get(customer_id, 0)
+        while start < len(invoices) and invoices[start].unpaid <= 0:
+            start += 1
+        self._customer_start[customer_id] = start
+        return [invoice for invoice in invoices[start:] if invoice.unpaid > 0]
+
+    def _match(self, line: BankLine, payment_method: int, payment_type: int) -> Match:
+        amount = _decimal(line.amount)
+        if amount <= 0:
+            return Match(line, UNMATCHED)
+
+        customer_id = self._payer(line)
+        referenced = self._referenced(line) if line.reference else []
+        if referenced:
+            if customer_id is None:
+                customer_id = referenced[0].customer_id
+            referenced = [i for i in referenced if i.customer_id == customer_id]
+
+        if referenced:
+            method, invoices = REFERENCE, referenced
+        else:
+            exact = self._exact(customer_id, amount)
+            if exact is not None:
+                method, invoices, customer_id = AMOUNT, [exact], exact.customer_id
+            elif customer_id is None:
+                return Match(line, UNMATCHED)
+            else:
+                invoices = self._oldest(customer_id)
+                method = OLDEST if invoices else ON_ACCOUNT
+
+        paid: List[PaidInvoice] = []
+        left = amount
+        for invoice in invoices:
+            if left <= 0:
+                break
+            allocated = min(left, invoice.unpaid)
+            paid.append(
+                PaidInvoice(
+                    invoice.id,
+                    invoice.label,
+                    _number(invoice.unpaid),
+                    _number(allocated),
+                )
+            )
+            invoice.unpaid -= allocated
+            left -= allocated
+
+        payment = {
+            "customer_id": customer_id,
+            "date_occurred": line.date,
+            "amount": _number(amount),
+            "payment_method": payment_method,
+            "payment_type": payment_type,
+            "amount_left_over": _number(left),
+            "selections_amount": _number(amount - left),
+            "invoices_paid": paid,
+        }
+        return Match(line, method, customer_id, payment)
+
+    def reconcile(
+        self, lines: Iterable[BankLine], payment_method: int, payment_type: int
+    ) -> Reconciliation:
+        """
+        Match bank lines, oldest first, and return their matches in input
+        order. Debit lines are left unmatched. The payments are ready to be
+        sent with ``client.payments.create_many(reconciliation.payments)``.
+        """
+        lines = list(lines)
+        matches: List[Optional[Match]] = [None] * len(lines)
+        for index in sorted(range(len(lines)), key=lambda i: lines[i].date):
+            matches[index] = self._match(lines[index], payment_method, payment_type)
+        return Reconciliation([m for m in matches if m is not None])
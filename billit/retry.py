@@ -0,0 +1,64 @@
+import random
+from typing import FrozenSet, Iterable, Optional
+
+from .ratelimit import parse_retry_after
+
+DEFAULT_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class RetryPolicy:
+    """
+    Retry policy for transient failures: connection errors, timeouts and the
+    statuses in ``retry_statuses``.
+
+    Delays grow exponentially from ``backoff_factor`` up to ``max_backoff``,
+    with full jitter so that concurrent workers do not retry in lockstep, and
+    never undercut a ``Retry-After`` sent by the server. Non-idempotent
+    methods (POST, PATCH) are retried only when ``idempotency_header`` is set,
+    in which case the client sends the same idempotency key on every attempt.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        idempotency_header: Optional[str] = IDEMPOTENCY_HEADER,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses: FrozenSet[int] = frozenset(retry_statuses)
+        self.idempotency_header = idempotency_header
+
+    def is_retryable_method(self, method: str) -> bool:
+        return method in IDEMPOTENT_METHODS or self.idempotency_header is not None
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff_factor * (2**attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def delay(self, method: str, attempt: int, response=None) -> Optional[float]:
+        """
+        Return how long to wait before retrying attempt number ``attempt``
+        (starting at 0), or ``None`` if it must not be retried. ``response`` is
+        ``None`` when the attempt failed with a connection error or timeout.
+        """
+        if attempt + 1 >= self.max_attempts or not self.is_retryable_method(method):
+            return None
+
+        retry_after = None
+        if response is not None:
+            if response.status_code not in self.retry_statuses:
+                return None
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        return max(self.backoff(attempt), retry_after or 0.0)
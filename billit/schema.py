@@ -0,0 +1,360 @@
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exceptions import ValidationError
+
+
+class _Unset:
+    def __repr__(self):
+        return "UNSET"
+
+
+# Marks a field left out of a partial payload
+UNSET: Any = _Unset()
+
+
+# Value types and formats of fields, checked by ``Schema.validate``
+NUMBER = (int, float, Decimal)
+DATE = "date"
+DATETIME = "datetime"
+
+_FORMATS = {
+    DATE: re.compile(r"\d{4}-\d{2}-\d{2}"),
+    DATETIME: re.compile(r"\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?"),
+}
+_FORMAT_DESCRIPTIONS = {
+    DATE: "a YYYY-MM-DD date",
+    DATETIME: "a YYYY-MM-DD date, optionally followed by a time",
+}
+_TYPE_DESCRIPTIONS = {
+    bool: "a boolean",
+    int: "an integer",
+    float: "a number",
+    Decimal: "a number",
+    str: "a string",
+    list: "a list",
+    dict: "an object",
+}
+
+
+def camel_case(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def _tax(tax) -> dict:
+    if isinstance(tax, dict):
+        return tax
+    return {"taxId": tax.taxId, "taxVatShow": tax.taxVatShow}
+
+
+def _paid_invoice(invoice) -> dict:
+    if isinstance(invoice, dict):
+        return invoice
+    return {
+        "id": invoice.id,
+        "label": invoice.label,
+        "unpaidAmount": invoice.unpaidAmount,
+        "paymentAmount": invoice.paymentAmount,
+    }
+
+
+def taxes(values) -> list:
+    return [_tax(tax) for tax in values]
+
+
+def paid_invoices(values) -> list:
+    return [_paid_invoice(invoice) for invoice in values]
+
+
+class Field:
+    """
+    A request field, sent under ``api_name`` (the camelCase form of ``name``
+    by default) after passing through ``converter``, if any.
+
+    ``type`` (a type or tuple of types), ``format`` and ``required`` describe
+    its valid values, for local validation; ``None`` is only invalid when the
+    field is required. ``has_default`` marks the fields whose argument has a
+    default in the method signature, which may be left out.
+    """
+
+    __slots__ = (
+        "name",
+        "api_name",
+        "converter",
+        "type",
+        "format",
+        "required",
+        "has_default",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        api_name: Optional[str] = None,
+        converter: Optional[Callable[[Any], Any]] = None,
+        type: Any = None,
+        format: Optional[str] = None,
+        required: bool = False,
+        has_default: bool = False,
+    ):
+        self.name = name
+        self.api_name = api_name or camel_case(name)
+        self.converter = converter
+        self.type = type
+        self.format = format
+        self.required = required
+        self.has_default = has_default
+
+
+def _compile_check(field: Field) -> Optional[Callable[[Any], Optional[str]]]:
+    """
+    Return a function checking a non-None value of ``field``, returning an
+    error message or ``None``, or ``None`` when any value is valid
+    """
+    types: Tuple[type, ...] = ()
+    if field.type is not None:
+        types = field.type if isinstance(field.type, tuple) else (field.type,)
+    if not types and field.format is None:
+        return None
+
+    # bool is a subclass of int, but never a valid number
+    allow_bool = bool in types
+    descriptions = dict.fromkeys(_TYPE_DESCRIPTIONS[t] for t in types)
+    if "a number" in descriptions:
+        descriptions.pop("an integer", None)
+    expected = " or ".join(descriptions)
+    pattern = description = None
+    if field.format is not None:
+        pattern = _FORMATS[field.format]
+        description = _FORMAT_DESCRIPTIONS[field.format]
+
+    def check(value) -> Optional[str]:
+        if types and (
+            not isinstance(value, types) or (isinstance(value, bool) and not allow_bool)
+        ):
+            return f"expected {expected}"
+        if pattern is not None:
+            if not isinstance(value, str) or not pattern.fullmatch(value):
+                return f"expected {description}"
+            try:
+                date.fromisoformat(value[:10])
+            except ValueError:
+                return "invalid date"
+        return None
+
+    return check
+
+
+class Schema:
+    """
+    Serializer from snake_case arguments to the camelCase payload of a resource.
+
+    The field table is resolved once, when the schema is declared, so that
+    building a payload is a single pass over precomputed tuples.
+    """
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+        self.mappings: Dict[str, str] = {field.name: field.api_name for field in fields}
+        self._compiled: Tuple[Tuple[str, str, Optional[Callable]], ...] = tuple(
+            (field.name, field.api_name, field.converter) for field in fields
+        )
+        self._by_name = {compiled[0]: compiled for compiled in self._compiled}
+        self._checks: Tuple[Tuple[str, bool, bool, Optional[Callable]], ...] = tuple(
+            (field.name, field.required, field.has_default, _compile_check(field))
+            for field in fields
+        )
+        self._checks_by_name = {check[0]: check for check in self._checks}
+
+    def only(self, *names: str) -> "Schema":
+        """
+        Return a schema with the given subset of fields
+        """
+        by_name = {field.name: field for field in self.fields}
+        return Schema(*(by_name[name] for name in names))
+
+    def dump(self, values: dict) -> dict:
+        """
+        Build the payload of every field from ``values``, which may hold other
+        keys as well (e.g. ``locals()`` of the calling method)
+        """
+        payload = {}
+        for name, api_name, converter in self._compiled:
+            value = values[name]
+            payload[api_name] = value if converter is None else converter(value)
+        return payload
+
+    def dump_partial(self, values: dict) -> dict:
+        """
+        Build the payload of the fields present in ``values``, skipping ``UNSET``.
+        Unknown field names raise ``TypeError``.
+        """
+        payload = {}
+        for name, value in values.items():
+            compiled = self._by_name.get(name)
+            if compiled is None:
+                raise TypeError(f"Unknown field: {name}")
+            if value is UNSET:
+                continue
+            _, api_name, converter = compiled
+            payload[api_name] = value if converter is None else converter(value)
+        return payload
+
+    def errors(self, values: dict, partial: bool = False) -> Dict[str, List[str]]:
+        """
+        Return the error messages of the invalid fields of ``values``, by name.
+
+        Every field without a default must be present, unless ``partial``, in
+        which case only the fields present and not ``UNSET`` are checked and
+        unknown names are errors.
+        """
+        errors: Dict[str, List[str]] = {}
+        if partial:
+            checks = []
+            for name, value in values.items():
+                entry = self._checks_by_name.get(name)
+                if entry is None:
+                    errors[name] = ["unknown field"]
+                elif value is not UNSET:
+                    checks.append(entry)
+        else:
+            checks = list(self._checks)
+
+        for name, required, has_default, check in checks:
+            if name not in values:
+                if not has_default:
+                    errors[name] = ["missing"]
+                continue
+            value = values[name]
+            if value is None:
+                if required:
+                    errors[name] = ["required"]
+                continue
+            message = None if check is None else check(value)
+            if message is not None:
+                errors[name] = [message]
+        return errors
+
+    def validate(self, values: dict, partial: bool = False):
+        """
+        Raise ``ValidationError`` when ``values`` has invalid fields
+        """
+        errors = self.errors(values, partial)
+        if errors:
+            raise ValidationError(errors)
+
+
+INVOICE = Schema(
+    Field("customer_id", type=int, required=True),
+    Field("send_mail", type=bool),
+    Field("exclude_mydata", type=bool),
+    Field("invoice_date", format=DATE, required=True),
+    Field("invoice_type_id", type=int, required=True),
+    Field("is_paid", type=bool),
+    Field("mydata_invoice_type", type=str),
+    Field("taxes", converter=taxes, type=list),
+    Field("products", type=list, required=True),
+    Field("tags", type=list),
+    Field("mydata_payment", type=dict),
+    Field("mail_options", type=(str, dict)),
+    Field("reminder", type=bool),
+    Field("payment_method", type=(list, str, int)),
+)
+INVOICE_UPDATE = INVOICE.only(
+    "customer_id",
+    "send_mail",
+    "exclude_mydata",
+    "invoice_date",
+    "invoice_type_id",
+    "mydata_invoice_type",
+    "taxes",
+    "products",
+    "tags",
+    "mydata_payment",
+)
+
+CUSTOMER = Schema(
+    Field("is_company", type=bool),
+    Field("company", type=str, required=True),
+    Field("lang", type=str),
+    Field("profession", type=str),
+    Field("in_charge", type=str),
+    Field("vat_id", type=str),
+    Field("tax_office", type=str),
+    Field("street_address", type=str),
+    Field("alias", type=str),
+    Field("customer_type", type=int, required=True),
+    Field("postal_code", type=str),
+    Field("city", type=str),
+    Field("country", type=str),
+    Field("mobile", type=str),
+    Field("phone", type=str),
+    Field("fax", type=str),
+    Field("info", type=str),
+    Field("public_note", type=str),
+    Field("addresses", type=list),
+)
+
+CONTACT_UPDATE = Schema(
+    *CUSTOMER.fields[:-1],
+    Field("contact_type", type=(int, str)),
+    Field("currency", type=str),
+    Field("addresses", type=list),
+)
+CONTACT = Schema(
+    *CONTACT_UPDATE.fields,
+    Field("email", type=str, has_default=True),
+    Field("tags", type=list, has_default=True),
+    Field("default_vat_id", type=int, has_default=True),
+)
+
+OCP = Schema(
+    Field("title", type=str, required=True),
+    Field("description", type=str),
+    Field("cost", type=NUMBER, required=True),
+    Field("customer_id", type=int, required=True),
+    Field("invoice_type_id", type=int),
+    Field("net_value", type=NUMBER),
+    Field("vat_id", type=int),
+    Field("product_id", type=int),
+    Field("payment_method_id", type=int),
+    Field("lang", type=str),
+    Field("expiration_at", format=DATETIME),
+)
+
+PRODUCT = Schema(
+    Field("name", type=str, required=True),
+    Field("description", type=str),
+    Field("name_sec", type=str),
+    Field("description_sec", type=str),
+    Field("unit_price", type=NUMBER, required=True),
+    Field("default_vat_id", type=int),
+    Field("stock", type=NUMBER),
+    Field("with_stock", type=bool),
+    Field("is_vat_included", type=bool),
+    Field("active", type=bool),
+)
+
+PURCHASE = Schema(
+    Field("supplier_id", type=int, required=True),
+    Field("invoice_num", type=(int, str)),
+    Field("vat_amount", type=NUMBER),
+    Field("clean_amount", type=NUMBER),
+    Field("date_occurred", format=DATE, required=True),
+    Field("irs_amount", type=NUMBER),
+    Field("irs_type", type=int),
+)
+
+PAYMENT = Schema(
+    Field("customer_id", type=int, required=True),
+    Field("date_occurred", format=DATE, required=True),
+    Field("amount", type=NUMBER, required=True),
+    Field("payment_method", type=int),
+    Field("payment_type", type=int),
+    Field("amount_left_over", type=NUMBER),
+    Field("selections_amount", type=NUMBER),
+    Field("invoices_paid", converter=paid_invoices, type=list),
+)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+from . import deadline
+from .exceptions import DeadlineExceeded
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into a single call.
+
+    While a call is in flight, callers with the same key wait for it and get
+    its result, or its exception, instead of making their own. Results are
+    shared between callers and must not be mutated.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(deadline.remaining()):
+                raise DeadlineExceeded()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Async counterpart of ``SingleFlight``, for calls made from a single event loop.
+
+    The shared call runs in its own task, so cancelling one of its callers
+    does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._futures: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._futures[key] = future
+            future.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(future)
+
+    def _done(self, key: str, future: asyncio.Future):
+        self._futures.pop(key, None)
+        # Retrieve the error even when every caller was cancelled meanwhile
+        if not future.cancelled():
+            future.exception()
+
+    def in_flight(self) -> int:
+        return len(self._futures)
@@ -0,0 +1,244 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from .constants import LIST_RESOURCES
+from .models import as_dict
+
+DEFAULT_FULL_SYNC_INTERVAL = 24 * 60 * 60
+SYNC_BATCH_SIZE = 500
+
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass
+class SyncResult:
+    """
+    Summary of a single sync run of a resource
+    """
+
+    resource: str
+    full: bool
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+
+def _record_id(record: dict) -> Optional[str]:
+    value = record.get("id", record.get("uuid"))
+    return None if value is None else str(value)
+
+
+def _version(record: dict, body: bytes) -> str:
+    # Prefer the server's modification time, fall back to a digest of the body
+    updated_at = record.get("updatedAt", record.get("updated_at"))
+    if updated_at is not None:
+        return str(updated_at)
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class SyncEngine:
+    """
+    Local SQLite mirror of Billit resources, kept up to date incrementally.
+
+    Each run upserts only records whose version (``updatedAt``, or a digest of
+    the body when absent) changed since the last run. When the API supports a
+    modified-since filter, pass its query parameter per resource in
+    ``since_params`` and incremental runs will only request records past the
+    stored high-water mark. Deleted records are detected by periodic full runs,
+    every ``full_sync_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        since_params: Optional[Dict[str, str]] = None,
+        full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+    ):
+        self.client = client
+        self.path = path
+        self.since_params = dict(since_params or {})
+        self.full_sync_interval = full_sync_interval
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                resource TEXT NOT NULL,
+                id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (resource, id)
+            );
+            CREATE TEMP TABLE IF NOT EXISTS seen (
+                resource TEXT, id TEXT, PRIMARY KEY (resource, id)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                resource TEXT PRIMARY KEY,
+                high_water TEXT,
+                last_sync REAL,
+                last_full_sync REAL
+            );
+            """
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _state(self, resource: str):
+        return self._connection.execute(
+            "SELECT high_water, last_full_sync FROM sync_state WHERE resource = ?",
+            (resource,),
+        ).fetchone() or (None, None)
+
+    def sync(self, resource: str, full: Optional[bool] = None, **filters) -> SyncResult:
+        """
+        Bring the mirror of ``resource`` up to date. A full run is made when
+        ``full`` is true, when no incremental filter is configured for the
+        resource, or when the last full run is older than ``full_sync_interval``.
+        """
+        if resource not in LIST_RESOURCES:
+            raise ValueError(f"Unknown resource: {resource}")
+
+        with self._lock:
+            high_water, last_full_sync = self._state(resource)
+            if full is None:
+                full = (
+                    resource not in self.since_params
+                    or high_water is None
+                    or last_full_sync is None
+                    or time.time() - last_full_sync > self.full_sync_interval
+                )
+            if full:
+                self._connection.execute(
+                    "DELETE FROM seen WHERE resource = ?", (resource,)
+                )
+        if not full:
+            filters[self.since_params[resource]] = high_water
+
+        result = SyncResult(resource, full)
+        sub_client = getattr(self.client, LIST_RESOURCES[resource])
+        started_at = time.time()
+        batch = []
+        for record in sub_client.iter_all(**filters):
+            batch.append(as_dict(record))
+            if len(batch) >= SYNC_BATCH_SIZE:
+                high_water = self._apply(resource, batch, result, high_water, full)
+                batch = []
+        high_water = self._apply(resource, batch, result, high_water, full)
+
+        with self._lock, self._connection as connection:
+            if full:
+                result.deleted = connection.execute(
+                    "DELETE FROM records WHERE resource = ? AND id NOT IN "
+                    "(SELECT id FROM seen WHERE resource = ?)",
+                    (resource, resource),
+                ).rowcount
+                connection.execute("DELETE FROM seen WHERE resource = ?", (resource,))
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state "
+                "(resource, high_water, last_sync, last_full_sync) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    resource,
+                    high_water,
+                    started_at,
+                    started_at if full else last_full_sync,
+                ),
+            )
+
+        return result
+
+    def _apply(self, resource, records, result, high_water, full):
+        codec = self.client.codec
+        now = time.time()
+        with self._lock, self._connection as connection:
+            for record in records:
+                id_ = _record_id(record)
+                if id_ is None:
+                    continue
+
+                body = codec.dumps(record)
+                version = _version(record, body)
+                if record.get("updatedAt", record.get("updated_at")) is not None and (
+                    high_water is None or version > high_water
+                ):
+                    high_water = version
+                if full:
+                    connection.execute(
+                        "INSERT OR IGNORE INTO seen (resource, id) VALUES (?, ?)",
+                        (resource, id_),
+                    )
+                row = connection.execute(
+                    "SELECT version FROM records WHERE resource = ? AND id = ?",
+                    (resource, id_),
+                ).fetchone()
+                if row is not None and row[0] == version:
+                    result.unchanged += 1
+                    continue
+
+                connection.execute(
+                    "INSERT OR REPLACE INTO records "
+                    "(resource, id, version, data, synced_at) VALUES (?, ?, ?, ?, ?)",
+                    (resource, id_, version, body.decode(), now),
+                )
+                if row is None:
+                    result.created += 1
+                else:
+                    result.updated += 1
+
+        return high_water
+
+    def get(self, resource: str, record_id) -> Optional[Any]:
+        """
+        Return a mirrored record by id, or ``None`` if it is not in the mirror
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM records WHERE resource = ? AND id = ?",
+                (resource, str(record_id)),
+            ).fetchone()
+        return None if row is None else self.client.codec.loads(row[0])
+
+    def query(self, resource: str, **where) -> Iterator[Any]:
+        """
+        Iterate over the mirrored records of ``resource`` whose top-level fields
+        equal the given values, e.g. ``query("contacts", vatId="EL123")``
+        """
+        sql = "SELECT data FROM records WHERE resource = ?"
+        args: list = [resource]
+        for field, value in where.items():
+            sql += f" AND json_extract(data, '$.{self._field(field)}') = ?"
+            args.append(value)
+
+        with self._lock:
+            rows = self._connection.execute(sql, args).fetchall()
+        for (data,) in rows:
+            yield self.client.codec.loads(data)
+
+    def create_index(self, field: str):
+        """
+        Index a top-level record field so that ``query`` on it does not scan
+        the whole mirror
+        """
+        field = self._field(field)
+        with self._lock, self._connection as connection:
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS records_{field} "
+                f"ON records (resource, json_extract(data, '$.{field}'))"
+            )
+
+    @staticmethod
+    def _field(field: str) -> str:
+        if not _FIELD_RE.match(field):
+            raise ValueError(f"Invalid field name: {field}")
+        return field
@@ -0,0 +1,64 @@
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+# Seconds, as a single limit or a (connect, read) pair
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+class Transport:
+    """
+    Pooled, keep-alive HTTP transport used by the client.
+
+    Wraps a single ``requests.Session`` so that connections to the Billit API
+    are reused across calls instead of paying a TCP+TLS handshake per request.
+    Any object exposing ``request(method, url, **kwargs)`` and ``close()`` can
+    be passed to the client in its place.
+
+    A transport is safe to share between threads; size ``pool_maxsize`` to
+    the number of threads making requests, so that each can keep a connection.
+    A ``session`` passed in is used as is: its adapters and headers are left
+    alone, and the pool options only apply to the session made otherwise.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        session=None,
+    ):
+        if session is None:
+            session = requests.Session()
+            # The API is authenticated per request; persisting cookies would
+            # only share server state between the threads using the client
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Connection"] = "keep-alive"
+        self.session = session
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .models import as_dict
+from .schema import UNSET, Schema
+
+CREATE = "create"
+UPDATE = "update"
+UNCHANGED = "unchanged"
+DUPLICATE = "duplicate"
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def _normalize_vat_id(value: Any) -> str:
+    return "".join(str(value).split()).upper()
+
+
+NORMALIZERS: Dict[str, Callable[[Any], str]] = {"vat_id": _normalize_vat_id}
+
+
+def _key(name: str, value: Any) -> tuple:
+    return name, NORMALIZERS.get(name, _normalize)(value)
+
+
+@dataclass
+class UpsertResult:
+    """
+    Outcome of a single row of an upsert. The ``result`` of a duplicate row
+    is the index of the earlier row it duplicates.
+    """
+
+    index: int
+    row: dict
+    action: str
+    record_id: Any = None
+    changes: dict = field(default_factory=dict)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class UpsertReport:
+    """
+    Summary of an upsert, with the outcome of every row in input order
+    """
+
+    results: List[UpsertResult] = field(default_factory=list)
+
+    def _count(self, action: str) -> int:
+        return sum(1 for r in self.results if r.action == action and r.ok)
+
+    @property
+    def created(self) -> int:
+        return self._count(CREATE)
+
+    @property
+    def updated(self) -> int:
+        return self._count(UPDATE)
+
+    @property
+    def unchanged(self) -> int:
+        return self._count(UNCHANGED)
+
+    @property
+    def duplicates(self) -> int:
+        return self._count(DUPLICATE)
+
+    @property
+    def failed(self) -> List[UpsertResult]:
+        return [r for r in self.results if not r.ok]
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "duplicates": self.duplicates,
+            "failed": len(self.failed),
+        }
+
+
+def plan(
+    rows: Iterable[dict],
+    records: Iterable[Any],
+    keys: Dict[str, str],
+    update_schema: Schema,
+) -> List[UpsertResult]:
+    """
+    Classify every row as a create, an update, unchanged or a duplicate of an
+    earlier row, against the existing records matched on any of ``keys``, a
+    mapping of ``create`` argument names to API names, e.g. ``vat_id: vatId``.
+
+    Existing records are indexed once, so the whole plan is linear in the
+    number of rows and records and needs no API call. Updates only carry the
+    fields of ``update_schema`` that differ from the matched record.
+    """
+    index: Dict[tuple, Any] = {}
+    for record in records:
+        record = as_dict(record)
+        for name, api_name in keys.items():
+            value = record.get(api_name)
+            if value not in (None, ""):
+                index.setdefault(_key(name, value), record)
+
+    planned: List[UpsertResult] = []
+    seen: Dict[tuple, int] = {}
+    for position, row in enumerate(rows):
+        lookups = [
+            _key(name, row[name])
+            for name in keys
+            if row.get(name) not in (None, "", UNSET)
+        ]
+        earlier = next((seen[key] for key in lookups if key in seen), None)
+        if earlier is not None:
+            planned.append(UpsertResult(position, row, DUPLICATE, result=earlier))
+            continue
+        for key in lookups:
+            seen[key] = position
+
+        record = next((index[key] for key in lookups if key in index), None)
+        if record is None:
+            planned.append(UpsertResult(position, row, CREATE))
+            continue
+
+        fields = {
+            name: value
+            for name, value in row.items()
+            if name in update_schema.mappings and value is not UNSET
+        }
+        payload = update_schema.dump_partial(fields)
+        changes = {}
+        for name, value in fields.items():
+            field_name = update_schema.mappings[name]
+            old, new = record.get(field_name), payload[field_name]
+            # Identifying fields only count as changed when they no longer match
+            if name in keys and old not in (None, "") and new not in (None, ""):
+                if _key(name, old) == _key(name, new):
+                    continue
+            if old != new:
+                changes[name] = value
+
+        action = UPDATE if changes else UNCHANGED
+        planned.append(UpsertResult(position, row, action, record.get("id"), changes))
+
+    return planned
@@ -0,0 +1,108 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import schema
+from .codec import default_codec
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Schemas of the arguments of each write operation, by operation name
+SCHEMAS: Dict[str, schema.Schema] = {
+    "invoices.create": schema.INVOICE,
+    "invoices.update": schema.INVOICE_UPDATE,
+    "customers.create": schema.CUSTOMER,
+    "customers.update": schema.CUSTOMER,
+    "contacts.create": schema.CONTACT,
+    "contacts.update": schema.CONTACT_UPDATE,
+    "ocp.create": schema.OCP,
+    "ocp.update": schema.OCP,
+    "products.create": schema.PRODUCT,
+    "products.update": schema.PRODUCT,
+    "purchases.create": schema.PURCHASE,
+    "payments.create": schema.PAYMENT,
+}
+
+
+@dataclass
+class InvalidRow:
+    """
+    An invalid line of an input file, with its error messages by argument name
+    """
+
+    path: str
+    line: int
+    errors: Dict[str, List[str]]
+
+
+def _validate_chunk(
+    operation: str, path: str, first_line: int, lines: List[bytes]
+) -> List[InvalidRow]:
+    resource_schema = SCHEMAS[operation]
+    loads = default_codec().loads
+    invalid = []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            values = loads(line)
+        except Exception as e:
+            invalid.append(InvalidRow(path, number, {"": [f"invalid JSON: {e}"]}))
+            continue
+        if not isinstance(values, dict):
+            invalid.append(InvalidRow(path, number, {"": ["expected an object"]}))
+            continue
+        errors = resource_schema.errors(values)
+        if errors:
+            invalid.append(InvalidRow(path, number, errors))
+    return invalid
+
+
+def _chunks(
+    paths: Iterable[str], chunk_size: int
+) -> Iterator[Tuple[str, int, List[bytes]]]:
+    for path in paths:
+        with open(path, "rb") as f:
+            first_line = 1
+            while True:
+                lines = list(itertools.islice(f, chunk_size))
+                if not lines:
+                    break
+                yield path, first_line, lines
+                first_line += len(lines)
+
+
+def validate_files(
+    paths: Iterable[str],
+    operation: str,
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[InvalidRow]:
+    """
+    Validate NDJSON files of ``operation`` arguments, e.g. one dict of
+    ``Invoices.create`` arguments per line for ``invoices.create``, and return
+    their invalid lines in file and line order.
+
+    Files are split into chunks of ``chunk_size`` lines, validated in parallel
+    by a pool of ``max_workers`` processes; at most two chunks per worker are
+    read ahead, so files of any size are validated with bounded memory.
+    """
+    if operation not in SCHEMAS:
+        raise ValueError(f"Unknown operation: {operation}")
+
+    workers = max_workers or os.cpu_count() or 1
+    invalid: List[InvalidRow] = []
+    chunks = _chunks(paths, chunk_size)
+    with ProcessPoolExecutor(workers) as executor:
+        queue: deque = deque(
+            executor.submit(_validate_chunk, operation, *chunk)
+            for chunk in itertools.islice(chunks, 2 * workers)
+        )
+        while queue:
+            invalid.extend(queue.popleft().result())
+            for chunk in itertools.islice(chunks, 1):
+                queue.append(executor.submit(_validate_chunk, operation, *chunk))
+    return invalid